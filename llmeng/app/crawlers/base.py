@@ -1,34 +1,52 @@
 from abc import ABC, abstractmethod
-import asyncio
 from pathlib import Path
-from typing import Optional, Generic, Type
+from typing import Callable, Optional, Generic, Type
 
-from playwright.async_api import Browser, async_playwright, BrowserContext, Page
+from playwright.async_api import async_playwright, BrowserContext, Page, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from playwright.async_api import Playwright as PlaywrightInstance
 
 from llmeng.domain.base.nosql import T
+from llmeng.metrics import metrics
+
+from .browser_pool import LAUNCH_ARGS, browser_pool
+from .resources import ResourcePolicy
 
 
 class BaseCrawler(ABC, Generic[T]):
     model: Type[T]
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
     @abstractmethod
     async def extract(self, link: str, **kwargs) -> None: ...
 
 
 class BasePlaywrightCrawler(BaseCrawler[T], ABC):
+    # Override per crawler, e.g. to allow a site's CDN or skip JavaScript.
+    resource_policy: ResourcePolicy = ResourcePolicy()
+    # Seconds to wait for new content after a scroll: first, and at most
+    scroll_initial_wait: float = 0.25
+    scroll_timeout: float = 8.0
+
     def __init__(
         self,
         scroll_limit: int = 5,
         headless: bool = True,
         user_data_dir: Optional[Path] = None,
+        resource_policy: Optional[ResourcePolicy] = None,
     ) -> None:
         self.scroll_limit = scroll_limit
         self.headless = headless
         self.user_data_dir = user_data_dir
+        if resource_policy is not None:
+            self.resource_policy = resource_policy
 
         self._playwright: Optional[PlaywrightInstance] = None
-        self._browser: Optional[Browser] = None
         self._context: Optional[BrowserContext] = None
         self._page: Optional[Page] = None
 
@@ -40,44 +58,60 @@ class BasePlaywrightCrawler(BaseCrawler[T], ABC):
         await self.stop()
 
     async def start(self) -> None:
-        """Initialize the Playwright browser and context."""
-        self._playwright = await async_playwright().start()
-
+        """Lease a browser context from the shared pool and open a page."""
         context_args = {
             "viewport": {"width": 1920, "height": 1080},
             "ignore_https_errors": True,
+            "java_script_enabled": self.resource_policy.javascript_enabled,
         }
 
-        if self.user_data_dir:
-            context_args["user_data_dir"] = str(self.user_data_dir)
-
-        self._browser = await self._playwright.chromium.launch(
-            headless=self.headless,
-            args=[
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-notifications",
-                "--disable-extensions",
-                "--disable-background-networking",
-            ],
-        )
-
-        self._context = await self._browser.new_context(**context_args)
-        self._page = await self._context.new_page()
-
-        # Set default timeout to 30 seconds
-        self._page.set_default_timeout(30000)
-
-        await self.set_extra_context_options()
+        try:
+            if self.user_data_dir:
+                # A persistent profile needs a browser of its own.
+                self._playwright = await async_playwright().start()
+                self._context = (
+                    await self._playwright.chromium.launch_persistent_context(
+                        str(self.user_data_dir),
+                        headless=self.headless,
+                        args=LAUNCH_ARGS,
+                        **context_args,
+                    )
+                )
+            else:
+                self._context = await browser_pool.acquire(**context_args)
+
+            if self.resource_policy.blocks_requests:
+                await self._context.route("**/*", self._route)
+            self._page = await self._context.new_page()
+
+            # Set default timeout to 30 seconds
+            self._page.set_default_timeout(30000)
+
+            await self.set_extra_context_options()
+        except BaseException:
+            await self.stop()
+            raise
 
     async def stop(self) -> None:
-        """Clean up Playwright resources."""
-        if self._context:
-            await self._context.close()
-        if self._browser:
-            await self._browser.close()
+        """Give the context back to the pool, or close the dedicated browser."""
         if self._playwright:
+            if self._context:
+                await self._context.close()
             await self._playwright.stop()
+        elif self._context:
+            await browser_pool.release(self._context)
+
+        self._playwright = None
+        self._context = None
+        self._page = None
+
+    async def _route(self, route: Route) -> None:
+        request = route.request
+        if self.resource_policy.allows(request.resource_type, request.url):
+            await route.continue_()
+        else:
+            metrics.increment(f"crawl.blocked_requests.{request.resource_type}")
+            await route.abort()
 
     async def set_extra_context_options(self) -> None:
         """Override to set additional context options."""
@@ -88,25 +122,77 @@ class BasePlaywrightCrawler(BaseCrawler[T], ABC):
         pass
 
     async def scroll_page(self) -> None:
-        """Scroll through the page based on the scroll limit."""
+        """
+        Scroll to the bottom until the page stops growing or the scroll limit
+        is reached. After each scroll, waits only as long as new content is
+        loading (see `_wait_for_growth()`).
+        """
         if not self._page:
             raise RuntimeError("Page not initialized. Call start() first.")
-
-        current_scroll = 0
-        last_height = await self._page.evaluate("document.body.scrollHeight")
-
+        if not self.resource_policy.javascript_enabled:
+            # Nothing can be lazy-loaded without scripts.
+            return
+
+        in_flight = 0
+
+        def on_request(_) -> None:
+            nonlocal in_flight
+            in_flight += 1
+
+        def on_request_done(_) -> None:
+            nonlocal in_flight
+            in_flight = max(in_flight - 1, 0)
+
+        page = self._page
+        page.on("request", on_request)
+        page.on("requestfinished", on_request_done)
+        page.on("requestfailed", on_request_done)
+        try:
+            current_scroll = 0
+            last_height = await page.evaluate("document.body.scrollHeight")
+            while True:
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                grew = await self._wait_for_growth(last_height, lambda: in_flight)
+                if not grew or (
+                    self.scroll_limit and current_scroll >= self.scroll_limit
+                ):
+                    break
+
+                last_height = await page.evaluate("document.body.scrollHeight")
+                current_scroll += 1
+        finally:
+            page.remove_listener("request", on_request)
+            page.remove_listener("requestfinished", on_request_done)
+            page.remove_listener("requestfailed", on_request_done)
+
+    async def _wait_for_growth(self, height: int, in_flight: Callable[[], int]) -> bool:
+        """
+        Wait until the page grows past `height`. Returns as soon as the DOM
+        does; while it doesn't, waits again with a doubled timeout as long as
+        requests are still in flight, up to `scroll_timeout` seconds overall.
+        """
+
+        wait = self.scroll_initial_wait
+        waited = 0.0
         while True:
-            await self._page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(5)  # Wait for content to load
-
-            new_height = await self._page.evaluate("document.body.scrollHeight")
-            if new_height == last_height or (
-                self.scroll_limit and current_scroll >= self.scroll_limit
-            ):
-                break
-
-            last_height = new_height
-            current_scroll += 1
+            try:
+                await self.page.wait_for_function(
+                    "height => document.body.scrollHeight > height",
+                    arg=height,
+                    # Checked on every animation frame: growth is seen at once.
+                    polling="raf",
+                    timeout=wait * 1000,
+                )
+
+                return True
+            except PlaywrightTimeoutError:
+                waited += wait
+
+            if in_flight() == 0 or waited >= self.scroll_timeout:
+                # The network is idle and nothing changed: the page is done.
+                return False
+
+            wait = min(wait * 2, self.scroll_timeout - waited)
 
     @property
     def page(self) -> Page:
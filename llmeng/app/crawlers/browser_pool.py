@@ -0,0 +1,158 @@
+import asyncio
+from dataclasses import dataclass
+
+from loguru import logger
+from playwright.async_api import Browser, BrowserContext, async_playwright
+from playwright.async_api import Playwright as PlaywrightInstance
+
+from llmeng.metrics import metrics
+from llmeng.settings import settings
+
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-notifications",
+    "--disable-extensions",
+    "--disable-background-networking",
+]
+
+
+@dataclass(eq=False)
+class _PooledBrowser:
+    browser: Browser
+    leases: int = 0
+    active: int = 0
+    retired: bool = False
+
+
+class BrowserPool:
+    """
+    One Playwright driver and Chromium process shared by all the Playwright
+    crawlers of the process, which lease isolated browser contexts from it.
+
+    At most `size` contexts are leased at once. The browser is relaunched if it
+    disconnects, and recycled once it has served `recycle_after_pages` leases
+    (when its last lease is released) to bound its memory. Playwright objects
+    belong to the event loop that created them: `close()` the pool before the
+    loop ends; it starts again lazily on the next lease.
+    """
+
+    def __init__(
+        self, size: int = 4, recycle_after_pages: int = 50, headless: bool = True
+    ) -> None:
+        self.size = size
+        self.recycle_after_pages = recycle_after_pages
+        self.headless = headless
+
+        self._playwright: PlaywrightInstance | None = None
+        self._current: _PooledBrowser | None = None
+        self._browsers: set[_PooledBrowser] = set()
+        self._leased: dict[BrowserContext, _PooledBrowser] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._lock: asyncio.Lock | None = None
+
+    async def acquire(self, **context_args) -> BrowserContext:
+        """Lease a new context; give it back with `release()`."""
+
+        if self._slots is None or self._lock is None:
+            self._slots = asyncio.Semaphore(self.size)
+            self._lock = asyncio.Lock()
+
+        await self._slots.acquire()
+        pooled = None
+        try:
+            async with self._lock:
+                pooled = await self._healthy_browser()
+                pooled.leases += 1
+                pooled.active += 1
+            context = await pooled.browser.new_context(**context_args)
+        except BaseException:
+            if pooled is not None:
+                pooled.active -= 1
+            self._slots.release()
+            raise
+
+        self._leased[context] = pooled
+        metrics.increment("browser_pool.leases")
+
+        return context
+
+    async def release(self, context: BrowserContext) -> None:
+        pooled = self._leased.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser context: {e!s}")
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+        if pooled is not None:
+            pooled.active -= 1
+            if pooled.retired and pooled.active == 0:
+                await self._close_browser(pooled)
+
+    async def close(self) -> None:
+        for context in list(self._leased):
+            await self.release(context)
+        for pooled in list(self._browsers):
+            await self._close_browser(pooled)
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+        self._playwright = None
+        self._current = None
+        self._slots = None
+        self._lock = None
+
+    async def _healthy_browser(self) -> _PooledBrowser:
+        pooled = self._current
+        if pooled is not None and not pooled.browser.is_connected():
+            logger.warning("Pooled browser disconnected. Relaunching it.")
+            metrics.increment("browser_pool.disconnects")
+            await self._retire(pooled)
+            pooled = None
+        elif pooled is not None and pooled.leases >= self.recycle_after_pages:
+            logger.info(f"Recycling browser after {pooled.leases} pages")
+            await self._retire(pooled)
+            pooled = None
+
+        if pooled is None:
+            pooled = self._current = await self._launch()
+
+        return pooled
+
+    async def _launch(self) -> _PooledBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        with metrics.timer("browser_pool.launch"):
+            browser = await self._playwright.chromium.launch(
+                headless=self.headless, args=LAUNCH_ARGS
+            )
+        pooled = _PooledBrowser(browser=browser)
+        self._browsers.add(pooled)
+
+        return pooled
+
+    async def _retire(self, pooled: _PooledBrowser) -> None:
+        """Stop leasing from `pooled`; it's closed once its last lease is back."""
+        pooled.retired = True
+        if self._current is pooled:
+            self._current = None
+        if pooled.active == 0:
+            await self._close_browser(pooled)
+
+    async def _close_browser(self, pooled: _PooledBrowser) -> None:
+        self._browsers.discard(pooled)
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser: {e!s}")
+
+
+# Global pool shared by the Playwright crawlers
+browser_pool = BrowserPool(
+    size=settings.BROWSER_POOL_SIZE,
+    recycle_after_pages=settings.BROWSER_RECYCLE_AFTER_PAGES,
+)
@@ -1,48 +1,82 @@
+import asyncio
 from urllib.parse import urlparse
+import uuid
 
-from langchain_community.document_loaders import AsyncHtmlLoader
 from langchain_community.document_transformers.html2text import Html2TextTransformer
+from langchain_core.documents import Document
 from loguru import logger
 
 from llmeng.domain.documents import ArticleDocument
+from llmeng.metrics import metrics
 
 from .base import BaseCrawler
+from .extraction import main_content, parse_html, site_selectors
+from .http_client import http_client
+
+
+def html_to_content(html: str, link: str) -> dict:
+    """
+    Convert the main content of an HTML page to the article content fields,
+    with the same metadata langchain's AsyncHtmlLoader extracts. CPU-bound: run
+    it off the event loop.
+    """
+
+    soup = parse_html(html)
+    title = soup.find("title")
+    description = soup.find("meta", attrs={"name": "description"})
+    html_tag = soup.find("html")
+    body = main_content(soup, site_selectors(link))
+
+    html2text = Html2TextTransformer()
+    doc_transformed = html2text.transform_documents([Document(page_content=str(body))])[
+        0
+    ]
+
+    return {
+        "Title": title.get_text() if title else None,
+        "Subtitle": (
+            description.get("content", "No description found.") if description else None
+        ),
+        "Content": doc_transformed.page_content,
+        "language": (html_tag.get("lang", "No language found.") if html_tag else None),
+    }
 
 
 class CustomArticleCrawler(BaseCrawler):
+    """
+    With `reparse=True` passed to `extract()`, a stored article is extracted
+    again, from the fetch cache or a conditional request (see `FetchMode`),
+    and overwritten instead of being skipped.
+    """
+
     model = ArticleDocument
 
     def __init__(self) -> None:
         super().__init__()
 
+    @metrics.timed()
     async def extract(self, link: str, **kwargs) -> None:
         old_model = self.model.find(link=link)
-        if old_model is not None:
+        if old_model is not None and not kwargs.get("reparse"):
             logger.info(f"Article already exists in the database: {link}")
 
             return
 
         logger.info(f"Starting scrapping article: {link}")
 
-        loader = AsyncHtmlLoader([link])
-        docs = loader.load()
-
-        html2text = Html2TextTransformer()
-        docs_transformed = html2text.transform_documents(docs)
-        doc_transformed = docs_transformed[0]
-
-        content = {
-            "Title": doc_transformed.metadata.get("title"),
-            "Subtitle": doc_transformed.metadata.get("description"),
-            "Content": doc_transformed.page_content,
-            "language": doc_transformed.metadata.get("language"),
-        }
+        html = await http_client.fetch_text(link)
+        # Parsing and conversion run in a worker thread, so the other crawls
+        # sharing the event loop keep making progress.
+        with metrics.timer("crawl.html_to_content"):
+            content = await asyncio.to_thread(html_to_content, html, link)
 
         parsed_url = urlparse(link)
         platform = parsed_url.netloc
 
         user = kwargs["user"]
         instance = self.model(
+            # Reparsing overwrites the stored article.
+            id=old_model.id if old_model else uuid.uuid4(),
             content=content,
             link=link,
             platform=platform,
@@ -0,0 +1,187 @@
+import re
+from typing import Iterable
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from llmeng.metrics import metrics
+
+# lxml parses several times faster than the pure-Python html.parser.
+HTML_PARSER = "lxml"
+
+# Article body selectors of the sites we crawl most, by domain (subdomains
+# included). Tried before the generic heuristics.
+SITE_SELECTORS = {
+    "medium.com": ["article"],
+    "substack.com": ["div.available-content", "div.body.markup"],
+    "github.io": ["main article", "main"],
+}
+
+# Elements without readable text, removed from the whole page.
+_NON_TEXT_TAGS = ["iframe", "noscript", "script", "style", "svg", "template"]
+# Elements, and class or id tokens (e.g. "sidebar", "related-posts", but not
+# "has-sidebar"), that usually hold boilerplate.
+_BOILERPLATE_TAGS = frozenset({"aside", "button", "footer", "form", "header", "nav"})
+_BOILERPLATE_NAMES = re.compile(
+    r"(?:site-|post-)?"
+    r"(?:banner|comments?|cookies?|footer|menu|modal|nav|navbar|navigation|"
+    r"newsletter|popup|promo|recommend\w*|related|share|sidebar|social|"
+    r"sponsor\w*|subscribe)"
+    r"(?:-(?:area|bar|box|buttons?|container|links?|list|posts?|section|widget|"
+    r"wrapper))?",
+    re.IGNORECASE,
+)
+_PARAGRAPH_TAGS = ["p", "pre", "blockquote", "td"]
+_MIN_PARAGRAPH_LENGTH = 25
+_MIN_CONTENT_LENGTH = 200
+# Boilerplate-looking elements holding at least this share of the paragraph
+# text around them are kept: they wrap the content rather than sit next to it.
+_MAX_BOILERPLATE_SHARE = 0.5
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def site_selectors(url_or_domain: str) -> list[str]:
+    domain = re.sub(r"^\w+://", "", url_or_domain).split("/")[0].lower()
+
+    return [
+        selector
+        for site, selectors in SITE_SELECTORS.items()
+        if domain == site or domain.endswith("." + site)
+        for selector in selectors
+    ]
+
+
+def _looks_like_boilerplate(tag: Tag) -> bool:
+    if tag.name in _BOILERPLATE_TAGS:
+        return True
+    tokens = [*tag.get("class", []), tag.get("id") or ""]
+
+    return any(_BOILERPLATE_NAMES.fullmatch(token) for token in tokens if token)
+
+
+def _paragraph_length(tag: Tag) -> int:
+    lengths = (
+        len(paragraph.get_text(" ", strip=True))
+        for paragraph in tag.find_all(_PARAGRAPH_TAGS)
+    )
+
+    return sum(length for length in lengths if length >= _MIN_PARAGRAPH_LENGTH)
+
+
+def _boilerplate(root: Tag) -> list[Tag]:
+    """
+    The elements under `root` that look like boilerplate, except the ones
+    holding a large share of its paragraph text.
+    """
+
+    max_length = _paragraph_length(root) * _MAX_BOILERPLATE_SHARE
+
+    return [
+        tag
+        for tag in root.find_all(True)
+        if _looks_like_boilerplate(tag)
+        and (max_length == 0 or _paragraph_length(tag) < max_length)
+    ]
+
+
+def _in_boilerplate(tag: Tag, boilerplate: set[int]) -> bool:
+    return any(id(parent) in boilerplate for parent in tag.parents)
+
+
+def _text_length(tag: Tag) -> int:
+    return len(tag.get_text(strip=True))
+
+
+def _link_density(tag: Tag) -> float:
+    text_length = _text_length(tag) or 1
+    link_length = sum(_text_length(link) for link in tag.find_all("a"))
+
+    return min(link_length / text_length, 1.0)
+
+
+def _best_scored(root: Tag, boilerplate: set[int]) -> Tag | None:
+    """
+    Readability-style scoring: every substantial paragraph outside boilerplate
+    adds to the score of its parent (fully) and grandparent (half), by its
+    length and number of commas. The best container, discounted by its link
+    density, wins.
+    """
+
+    scores: dict[int, tuple[Tag, float]] = {}
+    for paragraph in root.find_all(_PARAGRAPH_TAGS):
+        text = paragraph.get_text(" ", strip=True)
+        if len(text) < _MIN_PARAGRAPH_LENGTH or _in_boilerplate(paragraph, boilerplate):
+            continue
+
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = paragraph.parent
+        grandparent = parent.parent if parent is not None else None
+        for ancestor, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if not isinstance(ancestor, Tag) or ancestor.name == "[document]":
+                continue
+            _, total = scores.get(id(ancestor), (ancestor, 0.0))
+            scores[id(ancestor)] = (ancestor, total + score * weight)
+
+    best, best_score = None, 0.0
+    for candidate, score in scores.values():
+        score *= 1 - _link_density(candidate)
+        if score > best_score:
+            best, best_score = candidate, score
+
+    return best
+
+
+def _find_content(
+    soup: BeautifulSoup, selectors: Iterable[str]
+) -> tuple[str, Tag | None]:
+    # Boilerplate of the whole page, only used to rule out candidates: nothing
+    # is removed before the content is found.
+    boilerplate = {id(tag) for tag in _boilerplate(soup)}
+
+    for method, candidates in (
+        ("selector", selectors),
+        ("semantic", ["article", "main", "[role=main]"]),
+    ):
+        for selector in candidates:
+            for element in soup.select(selector):
+                if _in_boilerplate(element, boilerplate):
+                    continue
+                if _text_length(element) >= _MIN_CONTENT_LENGTH:
+                    return method, element
+
+                break
+
+    element = _best_scored(soup, boilerplate)
+    if element is not None and _text_length(element) >= _MIN_CONTENT_LENGTH:
+        return "scored", element
+
+    return "fallback", None
+
+
+def main_content(soup: BeautifulSoup, selectors: Iterable[str] = ()) -> Tag:
+    """
+    The element holding the page's main text, without navigation, footers,
+    recommendations and other boilerplate. Tries `selectors` first, then the
+    semantic containers, then readability-style scoring, and falls back to the
+    whole body. Boilerplate is only removed inside the chosen element, and
+    never when it holds a large share of its text. Modifies `soup`: read
+    anything else from it beforehand.
+    """
+
+    for tag in soup.find_all(_NON_TEXT_TAGS):
+        tag.decompose()
+
+    method, element = _find_content(soup, selectors)
+    if element is None:
+        element = soup.body or soup
+    metrics.increment(f"extraction.{method}")
+
+    # Outermost first: decomposing a tag also decomposes the ones inside it.
+    for tag in _boilerplate(element):
+        if not tag.decomposed:
+            tag.decompose()
+
+    return element
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from enum import StrEnum
+import gzip
+import hashlib
+import os
+from pathlib import Path
+import time
+
+from llmeng.nosql import db
+from llmeng.settings import settings
+
+
+class FetchMode(StrEnum):
+    # Conditional request for cached URLs; the cached body is reused on 304.
+    REVALIDATE = "revalidate"
+    # Cached URLs are served from disk without any request.
+    PREFER_CACHE = "prefer_cache"
+    # Cached URLs only: a cache miss is an error.
+    OFFLINE = "offline"
+
+
+class CacheMiss(LookupError):
+    pass
+
+
+@dataclass
+class CachedPage:
+    url: str
+    content_hash: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def validators(self) -> dict[str, str]:
+        """Headers that make a request for the page conditional."""
+
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class FetchCache:
+    """
+    Raw pages fetched by the crawlers, so pages can be reparsed without
+    downloading them again and refreshed with conditional requests.
+
+    Bodies are stored gzip-compressed under `directory`, named after the SHA-256
+    of their content (identical pages are stored once). The `fetch_cache` table
+    of the warehouse maps each URL to its current body and HTTP validators.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, content_hash: str) -> Path:
+        return self.directory / content_hash[:2] / f"{content_hash}.html.gz"
+
+    def lookup(self, url: str) -> CachedPage | None:
+        with db.get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT url, content_hash, etag, last_modified, fetched_at
+                FROM fetch_cache WHERE url = ?
+            """,
+                (url,),
+            ).fetchone()
+
+        return CachedPage(*row) if row else None
+
+    def read(self, page: CachedPage) -> str | None:
+        """The cached body of `page`, or None if its file is gone."""
+
+        path = self._path(page.content_hash)
+        if not path.exists():
+            return None
+
+        return gzip.decompress(path.read_bytes()).decode()
+
+    def cached_body(self, url: str, mode: FetchMode) -> str | None:
+        """
+        The cached body of `url` if `mode` serves it without a request. Raises
+        `CacheMiss` in offline mode when there is none.
+        """
+
+        if mode == FetchMode.REVALIDATE:
+            return None
+
+        page = self.lookup(url)
+        body = self.read(page) if page else None
+        if body is None and mode == FetchMode.OFFLINE:
+            raise CacheMiss(f"{url} is not in the fetch cache")
+
+        return body
+
+    def store(
+        self,
+        url: str,
+        body: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> CachedPage:
+        data = body.encode()
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._path(content_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(gzip.compress(data, compresslevel=6))
+            os.replace(tmp_path, path)
+
+        page = CachedPage(
+            url=url,
+            content_hash=content_hash,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=time.time(),
+        )
+        with db.get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO fetch_cache
+                (url, content_hash, etag, last_modified, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                (url, content_hash, etag, last_modified, page.fetched_at),
+            )
+            conn.commit()
+
+        return page
+
+    def touch(self, page: CachedPage) -> None:
+        """Record that `page` was revalidated as unchanged."""
+
+        page.fetched_at = time.time()
+        with db.get_connection() as conn:
+            conn.execute(
+                "UPDATE fetch_cache SET fetched_at = ? WHERE url = ?",
+                (page.fetched_at, page.url),
+            )
+            conn.commit()
+
+
+# Global cache shared by the crawlers
+fetch_cache = FetchCache(settings.FETCH_CACHE_DIR)
@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from enum import StrEnum
+import time
+
+from llmeng.nosql import db
+
+
+class LinkStatus(StrEnum):
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class FrontierLink:
+    link: str
+    user_full_name: str
+    priority: int
+    attempts: int
+
+
+class CrawlFrontier:
+    """
+    Persistent crawl queue in the warehouse's `crawl_frontier` table.
+
+    Workers `lease()` the pending links with the highest priority for
+    `lease_seconds`, then report each one as `complete()` or `fail()`. A failed
+    link is retried after an exponential backoff (`base_delay` seconds, doubled
+    per attempt, capped at `max_delay`) until it has been tried `max_attempts`
+    times. The lease of a worker that crashed expires, and its links are handed
+    out again, so an interrupted drain resumes without redoing completed links.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 60.0,
+        max_delay: float = 3600.0,
+        lease_seconds: float = 900.0,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+
+    def enqueue(self, links: list[str], user_full_name: str, priority: int = 0) -> int:
+        """Queue `links`, except the ones already queued. Returns the number added."""
+
+        now = time.time()
+        with db.get_connection() as conn:
+            cursor = conn.executemany(
+                """
+                INSERT OR IGNORE INTO crawl_frontier
+                (link, user_full_name, status, priority, attempts, next_attempt_at,
+                 updated_at)
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+            """,
+                [
+                    (link, user_full_name, LinkStatus.PENDING, priority, now, now)
+                    for link in links
+                ],
+            )
+            conn.commit()
+
+            return cursor.rowcount
+
+    def lease(self, worker_id: str, limit: int) -> list[FrontierLink]:
+        """
+        Claim up to `limit` links that are due: pending ones whose backoff has
+        passed, and in-progress ones whose lease expired.
+        """
+
+        now = time.time()
+        with db.get_connection() as conn:
+            # Take the write lock up front so concurrent workers never claim
+            # the same links.
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                """
+                SELECT link, user_full_name, priority, attempts
+                FROM crawl_frontier
+                WHERE (status = ? AND next_attempt_at <= ?)
+                   OR (status = ? AND lease_expires_at <= ?)
+                ORDER BY priority DESC, next_attempt_at
+                LIMIT ?
+            """,
+                (LinkStatus.PENDING, now, LinkStatus.IN_PROGRESS, now, limit),
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE crawl_frontier
+                SET status = ?, lease_owner = ?, lease_expires_at = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE link = ?
+            """,
+                [
+                    (
+                        LinkStatus.IN_PROGRESS,
+                        worker_id,
+                        now + self.lease_seconds,
+                        now,
+                        row[0],
+                    )
+                    for row in rows
+                ],
+            )
+            conn.commit()
+
+        return [
+            FrontierLink(
+                link=link,
+                user_full_name=user_full_name,
+                priority=priority,
+                attempts=attempts + 1,
+            )
+            for link, user_full_name, priority, attempts in rows
+        ]
+
+    def complete(self, link: str, worker_id: str) -> None:
+        self._finish(link, worker_id, LinkStatus.DONE, next_attempt_at=None)
+
+    def fail(self, link: FrontierLink, worker_id: str, error: str) -> LinkStatus:
+        """Schedule a retry of `link`, or give up on it. Returns its new status."""
+
+        if link.attempts >= self.max_attempts:
+            self._finish(link.link, worker_id, LinkStatus.FAILED, None, error)
+
+            return LinkStatus.FAILED
+
+        delay = min(self.base_delay * 2 ** (link.attempts - 1), self.max_delay)
+        self._finish(
+            link.link, worker_id, LinkStatus.PENDING, time.time() + delay, error
+        )
+
+        return LinkStatus.PENDING
+
+    def _finish(
+        self,
+        link: str,
+        worker_id: str,
+        status: LinkStatus,
+        next_attempt_at: float | None,
+        error: str | None = None,
+    ) -> None:
+        now = time.time()
+        with db.get_connection() as conn:
+            # A worker whose lease expired and was taken over doesn't report.
+            conn.execute(
+                """
+                UPDATE crawl_frontier
+                SET status = ?, next_attempt_at = COALESCE(?, next_attempt_at),
+                    lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = ?, updated_at = ?
+                WHERE link = ? AND lease_owner = ?
+            """,
+                (status, next_attempt_at, error, now, link, worker_id),
+            )
+            conn.commit()
+
+    def stats(self) -> dict[str, int]:
+        """Number of links per status."""
+
+        with db.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM crawl_frontier GROUP BY status"
+            ).fetchall()
+
+        return dict(rows)
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import os
 import shutil
 import subprocess
@@ -6,63 +8,353 @@ import tempfile
 from loguru import logger
 
 from llmeng.domain.documents import RepositoryDocument
+from llmeng.metrics import metrics
 
 from .base import BaseCrawler
 
+# Source and documentation files worth embedding.
+CODE_EXTENSIONS = frozenset(
+    {
+        ".c",
+        ".cc",
+        ".cfg",
+        ".cpp",
+        ".cs",
+        ".css",
+        ".go",
+        ".h",
+        ".hpp",
+        ".html",
+        ".java",
+        ".js",
+        ".jsx",
+        ".kt",
+        ".md",
+        ".php",
+        ".py",
+        ".rb",
+        ".rs",
+        ".rst",
+        ".scala",
+        ".sh",
+        ".sql",
+        ".swift",
+        ".ts",
+        ".tsx",
+        ".txt",
+        ".yaml",
+        ".yml",
+    }
+)
+CODE_FILENAMES = frozenset({"Dockerfile", "Justfile", "Makefile"})
+
+
+def _git(*args: str, cwd: str, input: str | None = None) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        input=input,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def _is_binary(data: bytes) -> bool:
+    # Git's heuristic: a NUL byte near the start of the file.
+    return b"\0" in data[:8000]
+
 
 class GithubCrawler(BaseCrawler[RepositoryDocument]):
+    """
+    Ingests a repository from a shallow, blob-size-filtered clone of its default
+    branch. Only files that pass `ignore`, the `extensions` allow-list (None
+    allows every text file) and `max_file_size` are checked out and read, in
+    parallel; binary files are skipped and a repository stops growing once its
+    files add up to `max_repository_size` characters.
+
+    With `refresh=True` passed to `extract()`, a stored repository is updated
+    from the files changed since its stored commit instead of being skipped.
+    """
+
     model = RepositoryDocument
 
-    def __init__(self, ignore=(".git", ".toml", ".lock", ".png")) -> None:
+    def __init__(
+        self,
+        ignore=(".git", ".toml", ".lock", ".png"),
+        extensions: frozenset[str] | None = CODE_EXTENSIONS,
+        max_file_size: int = 256_000,
+        max_repository_size: int = 50_000_000,
+        num_threads: int = 8,
+    ) -> None:
         super().__init__()
         self._ignore = ignore
+        self._extensions = extensions
+        self._max_file_size = max_file_size
+        self._max_repository_size = max_repository_size
+        self._num_threads = num_threads
 
+    @metrics.timed()
     async def extract(self, link: str, **kwargs) -> None:
         old_model = self.model.find(link=link)
         if old_model is not None:
-            logger.info(f"Repository already exists in the database: {link}")
+            if kwargs.get("refresh"):
+                await asyncio.to_thread(self._refresh, old_model)
+            else:
+                logger.info(f"Repository already exists in the database: {link}")
 
             return
 
         logger.info(f"Starting scrapping GitHub repository: {link}")
 
         repo_name = link.rstrip("/").split("/")[-1]
+        # Git and file I/O block: keep them off the crawlers' event loop.
+        tree, commit_sha = await asyncio.to_thread(self._ingest, link)
+
+        user = kwargs["user"]
+        instance = self.model(
+            content=tree,
+            name=repo_name,
+            link=link,
+            platform="github",
+            commit_sha=commit_sha,
+            author_id=user.id,
+            author_full_name=user.full_name,
+        )
+        instance.save()
+
+        logger.info(
+            f"Finished scrapping GitHub repository: {link}", num_files=len(tree)
+        )
+
+    def _refresh(self, document: RepositoryDocument) -> None:
+        """
+        Bring a stored repository up to date with the remote HEAD. Only the
+        files changed since the stored commit are downloaded and rewritten;
+        repositories stored without a commit are ingested again.
+        """
+
+        link = document.link
+        head = _git("ls-remote", link, "HEAD", cwd=tempfile.gettempdir()).split()[0]
+        if head == document.commit_sha:
+            logger.info(f"Repository is up to date: {link}")
+            metrics.increment("github.up_to_date")
+
+            return
+
+        logger.info(f"Refreshing GitHub repository: {link}")
+        if document.commit_sha is None:
+            document.content, document.commit_sha = self._ingest(link)
+        else:
+            try:
+                updated, deleted, commit_sha = self._ingest_changes(
+                    link, document.commit_sha
+                )
+            except subprocess.CalledProcessError as e:
+                # E.g. the stored commit is gone after a force push.
+                logger.warning(
+                    f"Incremental refresh of {link} failed, ingesting it again: "
+                    f"{e.stderr.strip()}"
+                )
+                document.content, document.commit_sha = self._ingest(link)
+            else:
+                content = {
+                    path: text
+                    for path, text in document.content.items()
+                    if path not in deleted
+                }
+                content.update(updated)
+                document.content = content
+                document.commit_sha = commit_sha
+                metrics.increment("github.updated_files", len(updated))
+                metrics.increment("github.deleted_files", len(deleted))
+                logger.info(
+                    f"Refreshed GitHub repository: {link}",
+                    num_updated_files=len(updated),
+                    num_deleted_files=len(deleted),
+                )
+
+        document.save()
+
+    def _ingest_changes(
+        self, link: str, base_sha: str
+    ) -> tuple[dict[str, str], set[str], str]:
+        """
+        Files added or modified between `base_sha` and the remote HEAD (read)
+        and removed or no longer eligible (deleted), and the HEAD commit.
+        """
 
         local_temp = tempfile.mkdtemp()
+        try:
+            repo_path = os.path.join(local_temp, "repository")
+            # Blobs above the size limit are left out, like in `_ingest`: the
+            # checkout below only downloads the changed files that fit.
+            with metrics.timer("github.fetch"):
+                _git(
+                    "clone",
+                    "--depth=1",
+                    f"--filter=blob:limit={self._max_file_size}",
+                    "--no-checkout",
+                    "--single-branch",
+                    "--no-tags",
+                    link,
+                    repo_path,
+                    cwd=local_temp,
+                )
+                _git("fetch", "--depth=1", "origin", base_sha, cwd=repo_path)
+            commit_sha = _git("rev-parse", "HEAD", cwd=repo_path).strip()
+            missing = self._missing_blobs(repo_path)
+
+            paths = []
+            deleted = set()
+            diff = _git(
+                "diff",
+                "--raw",
+                "--no-abbrev",
+                "--no-renames",
+                "-z",
+                base_sha,
+                "HEAD",
+                cwd=repo_path,
+            ).split("\0")
+            for info, path in zip(diff[0::2], diff[1::2]):
+                _, new_mode, _, new_sha, status = info.split()
+                if status == "D" or new_mode in ("120000", "160000"):
+                    deleted.add(path)
+                elif new_sha in missing:
+                    metrics.increment("github.skipped_large_files")
+                    deleted.add(path)
+                elif self._is_ignored(path):
+                    deleted.add(path)
+                else:
+                    paths.append(path)
+
+            if paths:
+                _git(
+                    "checkout",
+                    "HEAD",
+                    "--pathspec-from-file=-",
+                    "--pathspec-file-nul",
+                    cwd=repo_path,
+                    input="\0".join(paths),
+                )
+            updated = self._read_files(repo_path, paths)
+            # Changed files that became binary or too large.
+            deleted.update(set(paths) - updated.keys())
+
+            return updated, deleted, commit_sha
+        finally:
+            shutil.rmtree(local_temp, ignore_errors=True)
+
+    def _ingest(self, link: str) -> tuple[dict[str, str], str]:
+        """All the eligible files of the remote HEAD, and its commit."""
 
+        local_temp = tempfile.mkdtemp()
         try:
-            os.chdir(local_temp)
-            subprocess.run(["git", "clone", link])
+            repo_path = os.path.join(local_temp, "repository")
+            with metrics.timer("github.clone"):
+                _git(
+                    "clone",
+                    "--depth=1",
+                    f"--filter=blob:limit={self._max_file_size}",
+                    "--no-checkout",
+                    "--single-branch",
+                    "--no-tags",
+                    link,
+                    repo_path,
+                    cwd=local_temp,
+                )
 
-            repo_path = os.path.join(local_temp, os.listdir(local_temp)[0])
+            commit_sha = _git("rev-parse", "HEAD", cwd=repo_path).strip()
+            paths = self._select_paths(repo_path)
+            if paths:
+                # Only the selected files are written to disk.
+                _git(
+                    "checkout",
+                    "HEAD",
+                    "--pathspec-from-file=-",
+                    "--pathspec-file-nul",
+                    cwd=repo_path,
+                    input="\0".join(paths),
+                )
 
-            tree = {}
-            for root, _, files in os.walk(repo_path):
-                dir = root.replace(repo_path, "").lstrip("/")
-                if dir.startswith(self._ignore):
-                    continue
+            return self._read_files(repo_path, paths), commit_sha
+        finally:
+            shutil.rmtree(local_temp, ignore_errors=True)
+
+    def _missing_blobs(self, repo_path: str) -> set[str]:
+        # Blobs above the size limit weren't downloaded. List them without
+        # fetching them, so the checkout doesn't either.
+        return {
+            line[1:]
+            for line in _git(
+                "rev-list", "--objects", "--missing=print", "HEAD", cwd=repo_path
+            ).splitlines()
+            if line.startswith("?")
+        }
+
+    def _select_paths(self, repo_path: str) -> list[str]:
+        missing = self._missing_blobs(repo_path)
+
+        paths = []
+        for entry in _git("ls-tree", "-r", "-z", "HEAD", cwd=repo_path).split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1)
+            mode, object_type, sha = info.split()
+            # Skip submodules and symlinks.
+            if object_type != "blob" or mode == "120000":
+                continue
+            if sha in missing or self._is_ignored(path):
+                continue
+            paths.append(path)
+
+        metrics.increment("github.skipped_large_files", len(missing))
 
-                for file in files:
-                    if file.endswith(self._ignore):
-                        continue
-                    file_path = os.path.join(dir, file)  # noqa: PTH118
-                    with open(os.path.join(root, file), "r", errors="ignore") as f:
-                        tree[file_path] = f.read().replace(" ", "")
-
-            user = kwargs["user"]
-            instance = self.model(
-                content=tree,
-                name=repo_name,
-                link=link,
-                platform="github",
-                author_id=user.id,
-                author_full_name=user.full_name,
+        return paths
+
+    def _is_ignored(self, path: str) -> bool:
+        directory, _, name = path.rpartition("/")
+        if directory.startswith(self._ignore) or name.endswith(self._ignore):
+            return True
+        if self._extensions is None:
+            return False
+
+        extension = os.path.splitext(name)[1].lower()
+
+        return extension not in self._extensions and name not in CODE_FILENAMES
+
+    def _read_file(self, path: str) -> str | None:
+        with open(path, "rb") as f:
+            data = f.read(self._max_file_size + 1)
+        if len(data) > self._max_file_size or _is_binary(data):
+            return None
+
+        # Universal newlines, as reading in text mode would give.
+        text = data.decode("utf-8", errors="ignore")
+
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def _read_files(self, repo_path: str, paths: list[str]) -> dict[str, str]:
+        with ThreadPoolExecutor(max_workers=self._num_threads) as executor:
+            contents = executor.map(
+                self._read_file, [os.path.join(repo_path, path) for path in paths]
             )
-            instance.save()
 
-        except Exception:
-            raise
-        finally:
-            shutil.rmtree(local_temp)
+            tree = {}
+            size = 0
+            for path, content in zip(paths, contents):
+                if content is None:
+                    metrics.increment("github.skipped_binary_files")
+                    continue
+                if size + len(content) > self._max_repository_size:
+                    logger.warning(
+                        f"Repository exceeds {self._max_repository_size} characters, "
+                        f"skipping the remaining files",
+                        num_files=len(tree),
+                    )
+                    break
+                tree[path] = content
+                size += len(content)
 
-        logger.info(f"Finished scrapping GitHub repository: {link}")
+        return tree
@@ -0,0 +1,143 @@
+import asyncio
+
+import httpx
+from loguru import logger
+
+from llmeng.metrics import metrics
+from llmeng.settings import settings
+
+from .fetch_cache import FetchMode, fetch_cache
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpClient:
+    """
+    Connection-pooled async HTTP client shared by the crawlers that don't need a
+    browser. Connections are kept alive between requests to the same host and
+    responses are decompressed transparently.
+
+    Failed requests (connection errors, timeouts, 429 and 5xx responses) are
+    retried up to `retries` times with exponential backoff, honoring
+    `Retry-After`. Like the browser pool, the client belongs to the event loop
+    that first used it: `close()` it before the loop ends.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        max_connections: int = 32,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ) -> None:
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": USER_AGENT},
+                follow_redirects=True,
+            )
+
+        return self._client
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> httpx.Response:
+        """
+        GET `url`, retrying transient failures. Raises on error responses;
+        304 is returned, for conditional requests.
+        """
+
+        attempt = 0
+        while True:
+            delay = self.backoff * 2**attempt
+            try:
+                with metrics.timer("http.get"):
+                    response = await self.client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise
+                logger.warning(f"GET {url} failed ({e!r}), retrying in {delay} s")
+            else:
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.retries
+                ):
+                    if response.status_code != 304:
+                        response.raise_for_status()
+
+                    return response
+
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                logger.warning(
+                    f"GET {url} returned {response.status_code}, retrying in {delay} s"
+                )
+
+            metrics.increment("http.retries")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def fetch_text(self, url: str, mode: FetchMode | str | None = None) -> str:
+        """
+        The body of `url`, through the fetch cache: see `FetchMode` for how
+        cached pages are used (`FETCH_CACHE_MODE` by default).
+        """
+
+        mode = FetchMode(mode or settings.FETCH_CACHE_MODE)
+        body = fetch_cache.cached_body(url, mode)
+        if body is not None:
+            metrics.increment("fetch_cache.hits")
+
+            return body
+
+        cached = fetch_cache.lookup(url)
+        body = fetch_cache.read(cached) if cached else None
+        headers = cached.validators() if cached and body is not None else None
+        response = await self.get(url, headers=headers)
+        if response.status_code == 304 and cached and body is not None:
+            metrics.increment("fetch_cache.not_modified")
+            fetch_cache.touch(cached)
+
+            return body
+
+        metrics.increment("fetch_cache.misses")
+        fetch_cache.store(
+            url,
+            response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+        return response.text
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global client shared by the non-browser crawlers
+http_client = HttpClient(
+    timeout=settings.HTTP_TIMEOUT,
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    retries=settings.HTTP_RETRIES,
+)
@@ -6,6 +6,7 @@ from loguru import logger
 
 from llmeng.domain.documents import PostDocument
 from llmeng.domain.exceptions import ImproperlyConfigured
+from llmeng.metrics import metrics
 from llmeng.settings import settings
 
 from .base import BasePlaywrightCrawler
@@ -39,6 +40,7 @@ class LinkedInCrawler(BasePlaywrightCrawler[PostDocument]):
         await self.page.click(".login__form_action_container button")
         await self.page.wait_for_load_state("networkidle")
 
+    @metrics.timed()
     async def extract(self, link: str, **kwargs) -> None:
         if self._is_deprecated:
             raise DeprecationWarning(
@@ -1,38 +1,69 @@
-from bs4 import BeautifulSoup
+import asyncio
+import uuid
+
 from loguru import logger
 
 from llmeng.domain.documents import ArticleDocument
+from llmeng.metrics import metrics
+from llmeng.settings import settings
 
 from .base import BasePlaywrightCrawler
+from .extraction import main_content, parse_html, site_selectors
+from .fetch_cache import FetchMode, fetch_cache
+from .resources import ResourcePolicy
+
+
+def parse_article(html: str) -> dict:
+    soup = parse_html(html)
+    title = soup.find("h1", class_="pw-post-title")
+    subtitle = soup.find("h2", class_="pw-subtitle-paragraph")
+    # Only the article body: not the navigation, claps, responses and
+    # recommended stories around it.
+    body = main_content(soup, site_selectors("medium.com"))
+
+    return {
+        "Title": title.string if title else None,
+        "Subtitle": subtitle.string if subtitle else None,
+        "Content": body.get_text("\n", strip=True),
+    }
 
 
 class MediumCrawler(BasePlaywrightCrawler[ArticleDocument]):
+    """
+    With `reparse=True` passed to `extract()`, a stored article is extracted
+    again and overwritten instead of being skipped. Its rendered page comes
+    from the fetch cache unless `FETCH_CACHE_MODE` is "revalidate".
+    """
+
     model = ArticleDocument
+    # Articles are rendered server-side: the HTML alone has the full text.
+    resource_policy = ResourcePolicy(javascript_enabled=False)
 
+    @metrics.timed()
     async def extract(self, link: str, **kwargs) -> None:
         old_model = self.model.find(link=link)
-        if old_model is not None:
+        if old_model is not None and not kwargs.get("reparse"):
             logger.info(f"Article already exists in the database: {link}")
 
             return
 
         logger.info(f"Starting scrapping Medium article: {link}")
 
-        await self.page.goto(link)
-        await self.scroll_page()
-
-        soup = BeautifulSoup(await self.page.content(), "html.parser")
-        title = soup.find_all("h1", class_="pw-post-title")
-        subtitle = soup.find_all("h2", class_="pw-subtitle-paragraph")
+        html = fetch_cache.cached_body(link, FetchMode(settings.FETCH_CACHE_MODE))
+        if html is None:
+            await self.page.goto(link)
+            await self.scroll_page()
+            html = await self.page.content()
+            # The rendered page: reparsing it later needs no browser.
+            fetch_cache.store(link, html)
 
-        data = {
-            "Title": title[0].string if title else None,
-            "Subtitle": subtitle[0].string if subtitle else None,
-            "Content": soup.get_text(),
-        }
+        with metrics.timer("crawl.parse_article"):
+            data = await asyncio.to_thread(parse_article, html)
 
         user = kwargs["user"]
         instance = self.model(
+            # Reparsing overwrites the stored article.
+            id=old_model.id if old_model else uuid.uuid4(),
             platform="medium",
             content=data,
             link=link,
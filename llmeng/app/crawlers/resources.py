@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+# Resources that never carry the text we extract.
+HEAVY_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+# Analytics, ads and session-recording hosts (subdomains included).
+TRACKER_DOMAINS = frozenset(
+    {
+        "amplitude.com",
+        "branch.io",
+        "doubleclick.net",
+        "facebook.net",
+        "fullstory.com",
+        "google-analytics.com",
+        "googlesyndication.com",
+        "googletagmanager.com",
+        "hotjar.com",
+        "intercom.io",
+        "mixpanel.com",
+        "nr-data.net",
+        "optimizely.com",
+        "quantserve.com",
+        "scorecardresearch.com",
+        "segment.com",
+        "segment.io",
+        "sentry.io",
+    }
+)
+
+
+def _matches(host: str, domains: frozenset[str]) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """
+    Which requests a Playwright crawler lets through.
+
+    Requests of a `blocked_resource_types` type or to a `blocked_domains` host
+    are aborted, unless their host is in `allowed_domains`. With
+    `javascript_enabled=False` the page is loaded without running scripts, the
+    fast path for sites that render their content server-side.
+    """
+
+    blocked_resource_types: frozenset[str] = HEAVY_RESOURCE_TYPES
+    blocked_domains: frozenset[str] = TRACKER_DOMAINS
+    allowed_domains: frozenset[str] = field(default_factory=frozenset)
+    javascript_enabled: bool = True
+
+    @property
+    def blocks_requests(self) -> bool:
+        return bool(self.blocked_resource_types or self.blocked_domains)
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        if _matches(host, self.allowed_domains):
+            return True
+
+        return resource_type not in self.blocked_resource_types and not _matches(
+            host, self.blocked_domains
+        )
+
+
+# Loads everything, as a regular browser would.
+ALLOW_ALL = ResourcePolicy(
+    blocked_resource_types=frozenset(), blocked_domains=frozenset()
+)
@@ -0,0 +1,232 @@
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import time
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from llmeng.domain.documents import UserDocument
+from llmeng.metrics import metrics
+from llmeng.utils import split_user_full_name
+
+from .browser_pool import browser_pool
+from .dispatcher import CrawlerDispatcher
+from .frontier import CrawlFrontier, FrontierLink, LinkStatus
+from .http_client import http_client
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, at most `capacity` saved up.
+    `acquire()` waits until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        # Waiters are served one at a time, in arrival order.
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+@dataclass
+class CrawlResult:
+    link: str
+    domain: str
+    successful: bool
+    seconds: float
+    error: str | None = None
+
+
+class CrawlScheduler:
+    """
+    Crawls many links concurrently on a single event loop.
+
+    At most `max_concurrency` links are in flight overall and at most
+    `per_domain_concurrency` per domain. Requests to a domain start at most
+    `requests_per_second` times per second (with bursts of `burst`), and a link
+    that takes longer than `timeout` seconds to extract is cancelled and counted
+    as failed.
+    """
+
+    def __init__(
+        self,
+        dispatcher: CrawlerDispatcher,
+        max_concurrency: int = 16,
+        per_domain_concurrency: int = 8,
+        requests_per_second: float | None = 8.0,
+        burst: int = 8,
+        timeout: float | None = 180.0,
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.max_concurrency = max_concurrency
+        self.per_domain_concurrency = per_domain_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.timeout = timeout
+
+    async def crawl(
+        self,
+        links: list[str],
+        on_result: Callable[[CrawlResult], Any] | None = None,
+        close_pools: bool = True,
+        **kwargs,
+    ) -> list[CrawlResult]:
+        """
+        Crawl `links`, passing `kwargs` to each crawler's `extract`. Returns one
+        result per link, in the order of `links`; `on_result` is called as
+        each link finishes. With `close_pools=False`, the pooled browsers and
+        connections stay open for further crawls: `close()` them when done.
+        """
+
+        # Created here so they belong to the running event loop.
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+        domain_slots: dict[str, asyncio.Semaphore] = {}
+        domain_buckets: dict[str, TokenBucket] = {}
+
+        async def crawl_one(link: str) -> CrawlResult:
+            domain = urlparse(link).netloc
+            if domain not in domain_slots:
+                domain_slots[domain] = asyncio.Semaphore(self.per_domain_concurrency)
+                if self.requests_per_second:
+                    domain_buckets[domain] = TokenBucket(
+                        self.requests_per_second, capacity=self.burst
+                    )
+
+            # The domain slot is taken first, so links waiting on a busy domain
+            # don't hold global slots that other domains could use.
+            async with domain_slots[domain]:
+                if domain in domain_buckets:
+                    await domain_buckets[domain].acquire()
+                async with global_slots:
+                    result = await self._crawl_link(link, domain, **kwargs)
+
+            if on_result is not None:
+                on_result(result)
+
+            return result
+
+        try:
+            return await asyncio.gather(*(crawl_one(link) for link in links))
+        finally:
+            if close_pools:
+                await self.close()
+
+    @staticmethod
+    async def close() -> None:
+        # The pooled browser and HTTP connections belong to this event loop.
+        await browser_pool.close()
+        await http_client.close()
+
+    async def _crawl_link(self, link: str, domain: str, **kwargs) -> CrawlResult:
+        start = time.perf_counter()
+        error = None
+        try:
+            crawler = self.dispatcher.get_crawler(link)
+            # Playwright crawlers lease their browser context for the crawl. The
+            # timeout starts once it is leased: waiting for a free one is not
+            # the link's fault.
+            async with crawler:
+                await asyncio.wait_for(
+                    crawler.extract(link=link, **kwargs), timeout=self.timeout
+                )
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.timeout} s"
+            metrics.increment("crawl.timeouts")
+        except Exception as e:
+            error = f"{e!s}"
+
+        seconds = time.perf_counter() - start
+        successful = error is None
+        metrics.record("crawl.link", seconds, items=1, error=not successful)
+        if successful:
+            metrics.increment("crawl.successful")
+        else:
+            metrics.increment("crawl.failed")
+            logger.error(f"Failed to crawl {link}: {error}")
+
+        return CrawlResult(
+            link=link,
+            domain=domain,
+            successful=successful,
+            seconds=seconds,
+            error=error,
+        )
+
+
+async def drain_frontier(
+    frontier: CrawlFrontier,
+    scheduler: CrawlScheduler,
+    worker_id: str,
+    batch_size: int,
+    **kwargs,
+) -> dict[str, int]:
+    """
+    Crawl the links of `frontier` that are due, `batch_size` at a time, until
+    none are left, reporting each result back to the frontier. `kwargs` are
+    passed to the crawlers' `extract`, with the user each link was queued for.
+    """
+
+    counts: Counter[str] = Counter()
+    users: dict[str, UserDocument] = {}
+    try:
+        while leased := frontier.lease(worker_id, batch_size):
+            by_user: dict[str, dict[str, FrontierLink]] = {}
+            for item in leased:
+                by_user.setdefault(item.user_full_name, {})[item.link] = item
+
+            for user_full_name, items in by_user.items():
+                if user_full_name not in users:
+                    first_name, last_name = split_user_full_name(user_full_name)
+                    users[user_full_name] = UserDocument.get_or_create(
+                        first_name=first_name, last_name=last_name
+                    )
+
+                def report(result: CrawlResult, items=items) -> None:
+                    if result.successful:
+                        frontier.complete(result.link, worker_id)
+                        counts[str(LinkStatus.DONE)] += 1
+                    else:
+                        status = frontier.fail(
+                            items[result.link], worker_id, result.error or ""
+                        )
+                        # Failed links that will be retried later stay pending.
+                        counts[
+                            "retried" if status == LinkStatus.PENDING else str(status)
+                        ] += 1
+
+                await scheduler.crawl(
+                    list(items),
+                    on_result=report,
+                    close_pools=False,
+                    user=users[user_full_name],
+                    **kwargs,
+                )
+
+            logger.info(f"Drained {sum(counts.values())} link(s)", **counts)
+    finally:
+        # Once per drain: the browsers are reused across batches and users.
+        await scheduler.close()
+
+    return dict(counts)
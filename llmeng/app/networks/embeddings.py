@@ -1,23 +1,32 @@
+from collections import OrderedDict
 from functools import cached_property
+import json
 from pathlib import Path
-from typing import Optional
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Optional
 
 from numpy.typing import NDArray
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from torch import embedding
-from transformers import AutoTokenizer
 from loguru import logger
 
+from llmeng.metrics import metrics
 from llmeng.settings import settings
 
 from .base import SingletonMeta
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.cross_encoder import CrossEncoder
+    from transformers import AutoTokenizer
+
 
 class EmbeddingModelSingleton(metaclass=SingletonMeta):
     """
     A singleton class that provides a pre-trained transformer model for
     generating embeddings of input text.
+
+    Creating the singleton is cheap: torch, sentence-transformers and the model
+    weights are only loaded the first time the model is actually needed.
     """
 
     def __init__(
@@ -28,13 +37,39 @@ class EmbeddingModelSingleton(metaclass=SingletonMeta):
     ) -> None:
         self._model_id = model_id
         self._device = device
+        self._cache_dir = cache_dir
 
-        self._model = SentenceTransformer(
-            self._model_id,
-            device=self._device,
-            cache_folder=str(cache_dir) if cache_dir else None,
-        )
-        self._model.eval()
+        self._loaded_model: "SentenceTransformer | None" = None
+        self._load_lock = Lock()
+
+    @property
+    def _model(self) -> "SentenceTransformer":
+        if self._loaded_model is None:
+            with self._load_lock:
+                if self._loaded_model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info(f"Loading embedding model: {self._model_id}")
+                    with metrics.timer("embedding.load_model"):
+                        model = SentenceTransformer(
+                            self._model_id,
+                            device=self._device,
+                            cache_folder=(
+                                str(self._cache_dir) if self._cache_dir else None
+                            ),
+                        )
+                        model.eval()
+                    self._loaded_model = model
+
+        return self._loaded_model
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Whether the model weights have already been loaded.
+        """
+
+        return self._loaded_model is not None
 
     @property
     def model_id(self) -> str:
@@ -49,41 +84,220 @@ class EmbeddingModelSingleton(metaclass=SingletonMeta):
         """
         The size of the embeddings generated by the pre-trained
         transformer model.
+
+        Read once from the model's configuration files so that no forward pass
+        (or weight load) is needed. Falls back to the loaded model otherwise.
         """
 
-        dummy_embedding = self._model.encode("")
+        if not self.is_loaded:
+            try:
+                size = self._read_model_config("config.json")["hidden_size"]
+                for module in self._read_model_config("modules.json"):
+                    if module["type"].endswith("Dense"):
+                        dense_config = self._read_model_config(
+                            f"{module['path']}/config.json"
+                        )
+                        size = dense_config["out_features"]
 
-        return dummy_embedding.shape[0]
+                return int(size)
+            except Exception:
+                logger.warning(
+                    f"Couldn't read the embedding size of {self._model_id} from its config. Loading the model."
+                )
 
-    @property
+        return self._model.get_sentence_embedding_dimension()
+
+    @cached_property
     def max_input_length(self) -> int:
         """
         The maximum length of input text to tokenize.
         """
 
+        if not self.is_loaded:
+            try:
+                return int(
+                    self._read_model_config("sentence_bert_config.json")[
+                        "max_seq_length"
+                    ]
+                )
+            except Exception:
+                logger.warning(
+                    f"Couldn't read the max input length of {self._model_id} from its config. Loading the model."
+                )
+
         return self._model.max_seq_length
 
-    @property
-    def tokenizer(self) -> AutoTokenizer:
+    @cached_property
+    def tokenizer(self) -> "AutoTokenizer":
         """
         The tokenizer used to tokenize input text.
+
+        If the model isn't loaded yet, only the (fast) tokenizer is loaded, so
+        chunking doesn't pay for the model weights.
         """
 
-        return self._model.tokenizer
+        if self.is_loaded:
+            return self._model.tokenizer
+
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(
+            self._model_id,
+            cache_dir=str(self._cache_dir) if self._cache_dir else None,
+        )
+
+    def _read_model_config(self, filename: str) -> Any:
+        local_path = Path(self._model_id) / filename
+        if not local_path.is_file():
+            from huggingface_hub import hf_hub_download, try_to_load_from_cache
+
+            cache_dir = str(self._cache_dir) if self._cache_dir else None
+            # hf_hub_download checks the Hub for a newer revision even when the
+            # file is cached: only go to the network on a cache miss.
+            cached_path = try_to_load_from_cache(
+                self._model_id, filename, cache_dir=cache_dir
+            )
+            if isinstance(cached_path, str):
+                local_path = Path(cached_path)
+            else:
+                local_path = Path(
+                    hf_hub_download(self._model_id, filename, cache_dir=cache_dir)
+                )
+
+        with local_path.open() as f:
+            return json.load(f)
 
     def __call__(
-        self, input_text: str | list[str], to_list: bool = True
+        self, input_text: str | list[str], to_list: bool = True, batch_size: int = 32
     ) -> NDArray[np.float32] | list[float] | list[list[float]]:
+        """
+        Embed a text or a batch of texts.
+
+        With `to_list=False` the result stays a float32 ndarray (one row per
+        input for batches), so callers can hand out row views instead of
+        boxing every value into a Python float. `batch_size` is the number of
+        texts per forward pass (the model sorts texts by length first).
+        """
+
+        model = self._model
+        num_texts = 1 if isinstance(input_text, str) else len(input_text)
         try:
-            embeddings = self._model.encode(input_text)
+            with metrics.timer("embedding.encode", items=num_texts):
+                embeddings = model.encode(
+                    input_text, batch_size=max(batch_size, 1), convert_to_numpy=True
+                )
         except Exception:
             logger.error(
                 f"Failed to generate embeddings for {self._model_id=} and {input_text=}"
             )
 
-            return [] if to_list else np.array([])
+            return [] if to_list else np.array([], dtype=np.float32)
 
+        embeddings = np.asarray(embeddings, dtype=np.float32)
         if to_list:
-            embeddings = embeddings.tolist()
+            return embeddings.tolist()
 
         return embeddings
+
+
+class CrossEncoderModelSingleton(metaclass=SingletonMeta):
+    """
+    A singleton class that provides a pre-trained cross-encoder model for
+    scoring (query, text) pairs.
+
+    Pairs are scored in length-bucketed batches (so padding is bounded by the
+    longest pair of similar length, not of the whole input) and scores are
+    memoized, so re-ranking the same candidates again is free.
+    """
+
+    def __init__(
+        self,
+        model_id: str = settings.RERANKING_CROSS_ENCODER_MODEL_ID,
+        device: str = settings.RAG_MODEL_DEVICE,
+        batch_size: int = 32,
+        cache_size: int = 10_000,
+    ) -> None:
+        self._model_id = model_id
+        self._device = device
+        self._batch_size = batch_size
+        self._cache_size = cache_size
+
+        self._loaded_model: "CrossEncoder | None" = None
+        self._load_lock = Lock()
+        self._scores_cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._cache_lock = Lock()
+
+    @property
+    def _model(self) -> "CrossEncoder":
+        if self._loaded_model is None:
+            with self._load_lock:
+                if self._loaded_model is None:
+                    from sentence_transformers.cross_encoder import CrossEncoder
+
+                    logger.info(f"Loading cross-encoder model: {self._model_id}")
+                    with metrics.timer("reranking.load_model"):
+                        model = CrossEncoder(
+                            model_name=self._model_id, device=self._device
+                        )
+                        model.model.eval()
+                    self._loaded_model = model
+
+        return self._loaded_model
+
+    @property
+    def model_id(self) -> str:
+        """
+        The identifier of the pre-trained cross-encoder model to use.
+        """
+
+        return self._model_id
+
+    def __call__(
+        self, pairs: list[tuple[str, str]], to_list: bool = True
+    ) -> NDArray[np.float32] | list[float]:
+        scores = np.empty(len(pairs), dtype=np.float32)
+
+        missing: dict[tuple[str, str], list[int]] = {}
+        with self._cache_lock:
+            for i, pair in enumerate(pairs):
+                pair = (pair[0], pair[1])
+                cached = self._scores_cache.get(pair)
+                if cached is None:
+                    missing.setdefault(pair, []).append(i)
+                else:
+                    self._scores_cache.move_to_end(pair)
+                    scores[i] = cached
+
+        num_missing = sum(len(indices) for indices in missing.values())
+        metrics.increment("reranking.cache_hits", len(pairs) - num_missing)
+        if missing:
+            unique_pairs = list(missing)
+            # Bucket by length: neighbouring pairs in a batch pad to similar sizes.
+            order = sorted(
+                range(len(unique_pairs)),
+                key=lambda i: len(unique_pairs[i][0]) + len(unique_pairs[i][1]),
+            )
+            new_scores: dict[tuple[str, str], float] = {}
+            for start in range(0, len(order), self._batch_size):
+                batch = [
+                    unique_pairs[i] for i in order[start : start + self._batch_size]
+                ]
+                with metrics.timer("reranking.predict", items=len(batch)):
+                    batch_scores = self._model.predict(
+                        batch, batch_size=len(batch), show_progress_bar=False
+                    )
+                new_scores.update(
+                    zip(batch, np.asarray(batch_scores, dtype=np.float32).tolist())
+                )
+
+            with self._cache_lock:
+                for pair, score in new_scores.items():
+                    scores[missing[pair]] = score
+                    self._scores_cache[pair] = score
+                while len(self._scores_cache) > self._cache_size:
+                    self._scores_cache.popitem(last=False)
+
+        if to_list:
+            return scores.tolist()
+
+        return scores
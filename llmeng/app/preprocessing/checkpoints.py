@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterator
+import uuid
+
+from loguru import logger
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+from llmeng import utils
+from llmeng.infra.arrow import documents_to_table, table_to_documents
+from llmeng.nosql import db
+
+
+def document_key(document: BaseModel) -> str:
+    """The source document a cleaned document or a chunk belongs to."""
+
+    return str(getattr(document, "document_id", None) or document.id)
+
+
+def content_hash(documents: list[BaseModel]) -> str:
+    """Hash of the contents of the items (a document or its chunks), in order."""
+
+    digest = hashlib.sha256()
+    for document in documents:
+        content = document.content
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True)
+        digest.update(content.encode())
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def group_by_document(documents: list[BaseModel]) -> dict[str, list[BaseModel]]:
+    grouped: dict[str, list[BaseModel]] = {}
+    for document in documents:
+        grouped.setdefault(document_key(document), []).append(document)
+
+    return grouped
+
+
+def iter_document_batches(
+    grouped: dict[str, list[BaseModel]], min_size: int
+) -> Iterator[list[str]]:
+    """
+    Yield lists of document keys whose items add up to at least `min_size`
+    (except the last one), so that a batch never splits a document.
+    """
+
+    keys: list[str] = []
+    size = 0
+    for key, items in grouped.items():
+        keys.append(key)
+        size += len(items)
+        if size >= min_size:
+            yield keys
+            keys, size = [], 0
+
+    if keys:
+        yield keys
+
+
+def referenced_batch_uris() -> set[str]:
+    """The batch files that checkpoints of any stage still point to."""
+
+    with db.get_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT DISTINCT batch_uri FROM feature_checkpoints
+            WHERE batch_uri IS NOT NULL
+        """
+        ).fetchall()
+
+    return {batch_uri for (batch_uri,) in rows}
+
+
+class CheckpointStore:
+    """
+    Durable per-document progress of one stage (e.g. "embedded" or
+    "loaded:embedded_articles"), keyed by document ID and content hash.
+
+    A batch is committed in a single transaction once its work is done, so an
+    interrupted run either recorded every document of a batch or none of them.
+    A document whose content changed since it was checkpointed isn't complete.
+    """
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def completed(self, hashes: dict[str, str]) -> dict[str, str | None]:
+        """Map the documents of `hashes` that are complete to their batch URI."""
+
+        if not hashes:
+            return {}
+
+        completed = {}
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            for keys in utils.batch(list(hashes), 500):
+                placeholders = ", ".join(["?"] * len(keys))
+                cursor.execute(
+                    f"""
+                    SELECT document_id, content_hash, batch_uri
+                    FROM feature_checkpoints
+                    WHERE stage = ? AND document_id IN ({placeholders})
+                """,
+                    [self.stage, *keys],
+                )
+                for document_id, document_hash, batch_uri in cursor.fetchall():
+                    if hashes[document_id] == document_hash:
+                        completed[document_id] = batch_uri
+
+        return completed
+
+    def hashes(self, keys: list[str]) -> dict[str, str]:
+        """The content hash each of `keys` was last checkpointed with."""
+
+        hashes = {}
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            for keys_batch in utils.batch(keys, 500):
+                placeholders = ", ".join(["?"] * len(keys_batch))
+                cursor.execute(
+                    f"""
+                    SELECT document_id, content_hash
+                    FROM feature_checkpoints
+                    WHERE stage = ? AND document_id IN ({placeholders})
+                """,
+                    [self.stage, *keys_batch],
+                )
+                hashes.update(cursor.fetchall())
+
+        return hashes
+
+    def batch_uris(self, keys: list[str]) -> dict[str, str]:
+        """The last batch of each of `keys`, whatever content it was made from."""
+
+        batch_uris = {}
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            for keys_batch in utils.batch(keys, 500):
+                placeholders = ", ".join(["?"] * len(keys_batch))
+                cursor.execute(
+                    f"""
+                    SELECT document_id, batch_uri
+                    FROM feature_checkpoints
+                    WHERE stage = ? AND document_id IN ({placeholders})
+                    AND batch_uri IS NOT NULL
+                """,
+                    [self.stage, *keys_batch],
+                )
+                batch_uris.update(cursor.fetchall())
+
+        return batch_uris
+
+    def commit(self, hashes: dict[str, str], batch_uri: str | None = None) -> None:
+        with db.get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO feature_checkpoints
+                (stage, document_id, content_hash, batch_uri)
+                VALUES (?, ?, ?, ?)
+            """,
+                [
+                    (self.stage, document_id, document_hash, batch_uri)
+                    for document_id, document_hash in hashes.items()
+                ],
+            )
+            conn.commit()
+
+
+class BatchSpill:
+    """Completed batches of documents written to disk as Parquet files."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def write(self, documents: list[BaseModel]) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{uuid.uuid4()}.parquet"
+        tmp_path = path.with_suffix(".tmp")
+        pq.write_table(documents_to_table(documents), tmp_path)
+        # The rename is atomic: a batch file is either complete or absent.
+        os.replace(tmp_path, path)
+
+        return str(path)
+
+    def read(self, uris: set[str], keys: set[str]) -> tuple[list[Any], set[str]]:
+        """
+        Load the documents of `keys` from the batch files. Returns them and the
+        keys that couldn't be restored because their file is gone.
+        """
+
+        restored = []
+        found: set[str] = set()
+        for uri in sorted(uris):
+            if not os.path.exists(uri):
+                logger.warning(f"Checkpointed batch {uri} is missing")
+                continue
+            for document in table_to_documents(pq.read_table(uri, memory_map=True)):
+                key = document_key(document)
+                if key in keys:
+                    restored.append(document)
+                    found.add(key)
+
+        return restored, keys - found
+
+    def prune(self, keep: set[str]) -> int:
+        """
+        Delete the batch files not in `keep` (e.g. `referenced_batch_uris()`),
+        along with the leftovers of interrupted writes. Returns how many files
+        were deleted. Not safe while another run writes to the same directory.
+        """
+
+        if not self.directory.exists():
+            return 0
+
+        keep_paths = {Path(uri).resolve() for uri in keep}
+        num_deleted = 0
+        for path in self.directory.iterdir():
+            if path.suffix not in (".parquet", ".tmp"):
+                continue
+            if path.resolve() not in keep_paths:
+                path.unlink(missing_ok=True)
+                num_deleted += 1
+
+        return num_deleted
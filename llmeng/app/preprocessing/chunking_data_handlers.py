@@ -29,6 +29,9 @@ class ChunkingDataHandler(ABC, Generic[CleanedDocumentT, ChunkT]):
     def chunk(self, data_model: CleanedDocumentT) -> list[ChunkT]:
         pass
 
+    def chunk_batch(self, data_models: list[CleanedDocumentT]) -> list[list[ChunkT]]:
+        return [self.chunk(data_model) for data_model in data_models]
+
 
 class PostChunkingHandler(ChunkingDataHandler):
     @property
@@ -53,7 +56,7 @@ class PostChunkingHandler(ChunkingDataHandler):
                 author_id=data_model.author_id,
                 author_full_name=data_model.author_full_name,
                 image=getattr(data_model, "image", None),
-                metadata=self.metadata.__dict__,
+                metadata=self.metadata,
             )
             data_models_list.append(model)
 
@@ -14,7 +14,7 @@ from llmeng.domain.cleaned_documents import (
     CleanedRepositoryDocument,
 )
 
-from .operations import clean_text
+from .operations import clean_and_join
 
 DocumentT = TypeVar("DocumentT", bound=Document)
 CleanedDocumentT = TypeVar("CleanedDocumentT", bound=CleanedDocument)
@@ -25,12 +25,15 @@ class CleaningDataHandler(ABC, Generic[DocumentT, CleanedDocumentT]):
     def clean(self, data_model: DocumentT) -> CleanedDocumentT:
         pass
 
+    def clean_batch(self, data_models: list[DocumentT]) -> list[CleanedDocumentT]:
+        return [self.clean(data_model) for data_model in data_models]
+
 
 class PostCleaningHandler(CleaningDataHandler):
     def clean(self, data_model: PostDocument) -> CleanedPostDocument:
         return CleanedPostDocument(
             id=data_model.id,
-            content=clean_text(" #### ".join(data_model.content.values())),
+            content=clean_and_join(data_model.content.values()),
             platform=data_model.platform,
             author_id=data_model.author_id,
             author_full_name=data_model.author_full_name,
@@ -44,7 +47,7 @@ class ArticleCleaningHandler(CleaningDataHandler):
 
         return CleanedArticleDocument(
             id=data_model.id,
-            content=clean_text(" #### ".join(valid_content)),
+            content=clean_and_join(valid_content),
             platform=data_model.platform,
             link=data_model.link,
             author_id=data_model.author_id,
@@ -56,7 +59,7 @@ class RepositoryCleaningHandler(CleaningDataHandler):
     def clean(self, data_model: RepositoryDocument) -> CleanedRepositoryDocument:
         return CleanedRepositoryDocument(
             id=data_model.id,
-            content=clean_text(" #### ".join(data_model.content.values())),
+            content=clean_and_join(data_model.content.values()),
             platform=data_model.platform,
             name=data_model.name,
             link=data_model.link,
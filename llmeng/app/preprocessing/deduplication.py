@@ -0,0 +1,203 @@
+from collections import Counter
+import hashlib
+import re
+import zlib
+
+from loguru import logger
+from numpy.typing import NDArray
+import numpy as np
+
+from llmeng.domain.chunks import Chunk
+from llmeng.nosql import db
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles.
+
+    The permutations are derived from a fixed seed and shingles are hashed with
+    CRC32, so signatures are stable across processes and runs and can be
+    persisted.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+        generator = np.random.RandomState(seed)
+        # a, b < 2**32 and hashes < 2**32, so a * h + b never overflows uint64.
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set[str]:
+        words = _WORD_PATTERN.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)}
+
+        return {
+            " ".join(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> NDArray[np.uint32]:
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in self.shingles(text)),
+            dtype=np.uint64,
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        permuted &= _MAX_HASH
+
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def _optimal_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """Pick (bands, rows) whose LSH S-curve threshold, (1/b)^(1/r), is closest."""
+
+    candidates = [
+        (b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0
+    ]
+
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class ChunkDeduplicator:
+    """
+    Drops chunks that are near duplicates (estimated Jaccard similarity of their
+    word shingles >= `threshold`) of a chunk of the same category and author
+    seen before, in this run or a previous one. Chunks of different authors
+    are never duplicates of each other: retrieval filtered by author must still
+    find each author's content.
+
+    Signatures and LSH buckets of the kept chunks are stored in the warehouse,
+    so the index persists across runs. `filter()` must get all the chunks of a
+    document at once: they replace the ones indexed for it before, so an edited
+    chunk isn't a duplicate of its own previous version.
+    """
+
+    def __init__(
+        self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 3
+    ) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+
+        self.threshold = threshold
+        self._hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self._bands, self._rows = _optimal_bands(num_perm, threshold)
+
+        self._num_chunks: Counter[str] = Counter()
+        self._num_duplicates: Counter[str] = Counter()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            **{
+                str(category): {
+                    "num_chunks": num_chunks,
+                    "num_duplicates": self._num_duplicates[category],
+                    "num_kept": num_chunks - self._num_duplicates[category],
+                }
+                for category, num_chunks in self._num_chunks.items()
+            },
+        }
+
+    def _buckets(self, signature: NDArray[np.uint32]) -> list[tuple[int, int]]:
+        buckets = []
+        for band in range(self._bands):
+            rows = signature[band * self._rows : (band + 1) * self._rows]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+            buckets.append((band, int.from_bytes(digest, "big", signed=True)))
+
+        return buckets
+
+    def filter(self, chunks: list[Chunk]) -> list[Chunk]:
+        """Return the chunks that are not near duplicates, indexing the kept ones."""
+
+        kept = []
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            document_ids = sorted({str(chunk.document_id) for chunk in chunks})
+            for table in ("chunk_signatures", "chunk_lsh_buckets"):
+                cursor.executemany(
+                    f"DELETE FROM {table} WHERE document_id = ?",
+                    [(document_id,) for document_id in document_ids],
+                )
+
+            for chunk in chunks:
+                category = str(chunk.get_category())
+                author_id = str(chunk.author_id)
+                chunk_id = str(chunk.id)
+                document_id = str(chunk.document_id)
+                self._num_chunks[category] += 1
+
+                signature = self._hasher.signature(chunk.content)
+                buckets = self._buckets(signature)
+
+                placeholders = ", ".join(["(?, ?)"] * len(buckets))
+                cursor.execute(
+                    f"""
+                    SELECT DISTINCT s.chunk_id, s.signature
+                    FROM chunk_lsh_buckets b
+                    JOIN chunk_signatures s ON s.chunk_id = b.chunk_id
+                    WHERE b.category = ? AND b.author_id = ?
+                      AND (b.band, b.bucket) IN (VALUES {placeholders})
+                """,
+                    [
+                        category,
+                        author_id,
+                        *(value for bucket in buckets for value in bucket),
+                    ],
+                )
+                candidates = cursor.fetchall()
+
+                if self._is_duplicate(signature, candidates):
+                    self._num_duplicates[category] += 1
+                    continue
+
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO chunk_signatures
+                    (chunk_id, document_id, category, author_id, signature)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                    (chunk_id, document_id, category, author_id, signature.tobytes()),
+                )
+                cursor.executemany(
+                    """
+                    INSERT INTO chunk_lsh_buckets
+                    (document_id, category, author_id, band, bucket, chunk_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                    [
+                        (document_id, category, author_id, band, bucket, chunk_id)
+                        for band, bucket in buckets
+                    ],
+                )
+                kept.append(chunk)
+
+            conn.commit()
+
+        if len(kept) < len(chunks):
+            logger.info(
+                "Near-duplicate chunks dropped",
+                num=len(chunks) - len(kept),
+                total=len(chunks),
+            )
+
+        return kept
+
+    def _is_duplicate(
+        self, signature: NDArray[np.uint32], candidates: list[tuple[str, bytes]]
+    ) -> bool:
+        for _, candidate_bytes in candidates:
+            candidate = np.frombuffer(candidate_bytes, dtype=np.uint32)
+            if candidate.shape != signature.shape:
+                continue
+            if np.mean(candidate == signature) >= self.threshold:
+                return True
+
+        return False
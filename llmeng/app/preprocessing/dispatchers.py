@@ -1,3 +1,5 @@
+from typing import Any, Callable, ClassVar, Generic, TypeVar
+
 from loguru import logger
 
 from llmeng.app.preprocessing.embedding_data_handlers import (
@@ -6,12 +8,14 @@ from llmeng.app.preprocessing.embedding_data_handlers import (
     PostEmbeddingHandler,
     QueryEmbeddingHandler,
     RepositoryEmbeddingHandler,
+    embed_contents,
 )
 from llmeng.domain.base.nosql import NoSQLBaseDocument
 from llmeng.domain.base.vector import VectorBaseDocument
 from llmeng.domain.chunks import Chunk
 from llmeng.domain.embedded_chunks import EmbeddedChunk
 from llmeng.domain.types import DataCategory
+from llmeng.metrics import metrics
 
 from .chunking_data_handlers import (
     ArticleChunkingHandler,
@@ -26,19 +30,58 @@ from .cleaning_data_handlers import (
     RepositoryCleaningHandler,
 )
 
+HandlerT = TypeVar("HandlerT")
+ItemT = TypeVar("ItemT")
 
-class CleaningHandlerFactory:
-    @staticmethod
-    def create_handler(data_category: DataCategory) -> CleaningDataHandler:
-        match data_category:
-            case DataCategory.POSTS:
-                return PostCleaningHandler()
-            case DataCategory.ARTICLES:
-                return ArticleCleaningHandler()
-            case DataCategory.REPOSITORIES:
-                return RepositoryCleaningHandler()
-            case _:
+
+class HandlerFactory(Generic[HandlerT]):
+    """
+    Registry of handler classes per data category. Handlers are stateless, so
+    each one is built once and then reused by every dispatch.
+    """
+
+    _registry: ClassVar[dict[DataCategory, type]] = {}
+    _handlers: ClassVar[dict[DataCategory, Any]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._registry = dict(cls._registry)
+        cls._handlers = {}
+
+    @classmethod
+    def register(cls, data_category: DataCategory, handler: type[HandlerT]) -> None:
+        cls._registry[data_category] = handler
+        cls._handlers.pop(data_category, None)
+
+    @classmethod
+    def create_handler(cls, data_category: DataCategory) -> HandlerT:
+        handler = cls._handlers.get(data_category)
+        if handler is None:
+            if data_category not in cls._registry:
                 raise ValueError("Unsupported data type")
+            handler = cls._handlers[data_category] = cls._registry[data_category]()
+
+        return handler
+
+
+def _group_by_category(
+    items: list[ItemT], get_category: Callable[[ItemT], DataCategory]
+) -> dict[DataCategory, list[int]]:
+    """Indices of the items per category, in input order."""
+
+    groups: dict[DataCategory, list[int]] = {}
+    for i, item in enumerate(items):
+        groups.setdefault(get_category(item), []).append(i)
+
+    return groups
+
+
+class CleaningHandlerFactory(HandlerFactory[CleaningDataHandler]):
+    _registry = {
+        DataCategory.POSTS: PostCleaningHandler,
+        DataCategory.ARTICLES: ArticleCleaningHandler,
+        DataCategory.REPOSITORIES: RepositoryCleaningHandler,
+    }
 
 
 class CleaningDispatcher:
@@ -46,30 +89,42 @@ class CleaningDispatcher:
 
     @classmethod
     def dispatch(cls, data_model: NoSQLBaseDocument) -> VectorBaseDocument:
-        data_category = DataCategory(data_model.get_collection_name())
-        handler = cls.factory.create_handler(data_category)
-        clean_model = handler.clean(data_model)
+        return cls.dispatch_many([data_model])[0]
 
-        logger.info(
-            "Document cleaned",
-            data_category=data_category,
-            cleanded_content_len=len(clean_model.content),
+    @classmethod
+    @metrics.timed("cleaning.dispatch_many", items=len)
+    def dispatch_many(
+        cls, data_models: list[NoSQLBaseDocument]
+    ) -> list[VectorBaseDocument]:
+        """Clean documents of any categories, one batch per category, in input order."""
+
+        cleaned_models: list[Any] = [None] * len(data_models)
+        groups = _group_by_category(
+            data_models,
+            lambda data_model: DataCategory(data_model.get_collection_name()),
         )
+        for data_category, indices in groups.items():
+            handler = cls.factory.create_handler(data_category)
+            clean_models = handler.clean_batch([data_models[i] for i in indices])
+            for i, clean_model in zip(indices, clean_models, strict=True):
+                cleaned_models[i] = clean_model
 
-        return clean_model
+            logger.info(
+                "Documents cleaned",
+                data_category=data_category,
+                num=len(indices),
+                cleanded_content_len=sum(len(model.content) for model in clean_models),
+            )
 
+        return cleaned_models
 
-class ChunkingHandlerFactory:
-    @staticmethod
-    def create_handler(data_category: DataCategory) -> ChunkingDataHandler:
-        if data_category == DataCategory.POSTS:
-            return PostChunkingHandler()
-        elif data_category == DataCategory.ARTICLES:
-            return ArticleChunkingHandler()
-        elif data_category == DataCategory.REPOSITORIES:
-            return RepositoryChunkingHandler()
-        else:
-            raise ValueError("Unsupported data type")
+
+class ChunkingHandlerFactory(HandlerFactory[ChunkingDataHandler]):
+    _registry = {
+        DataCategory.POSTS: PostChunkingHandler,
+        DataCategory.ARTICLES: ArticleChunkingHandler,
+        DataCategory.REPOSITORIES: RepositoryChunkingHandler,
+    }
 
 
 class ChunkingDispatcher:
@@ -77,32 +132,40 @@ class ChunkingDispatcher:
 
     @classmethod
     def dispatch(cls, data_model: VectorBaseDocument) -> list[Chunk]:
-        data_category = data_model.get_category()
-        handler = cls.factory.create_handler(data_category)
-        chunk_models = handler.chunk(data_model)
+        return cls.dispatch_many([data_model])
 
-        logger.info(
-            "Document chunked successfully.",
-            num=len(chunk_models),
-            data_category=data_category,
+    @classmethod
+    @metrics.timed("chunking.dispatch_many", items=len)
+    def dispatch_many(cls, data_models: list[VectorBaseDocument]) -> list[Chunk]:
+        """Chunk documents of any categories; chunks come out in document order."""
+
+        chunks_per_document: list[list[Chunk]] = [[] for _ in data_models]
+        groups = _group_by_category(
+            data_models, lambda data_model: data_model.get_category()
         )
+        for data_category, indices in groups.items():
+            handler = cls.factory.create_handler(data_category)
+            chunk_models = handler.chunk_batch([data_models[i] for i in indices])
+            for i, document_chunks in zip(indices, chunk_models, strict=True):
+                chunks_per_document[i] = document_chunks
 
-        return chunk_models
+            logger.info(
+                "Documents chunked successfully.",
+                num=sum(len(document_chunks) for document_chunks in chunk_models),
+                num_documents=len(indices),
+                data_category=data_category,
+            )
 
+        return [chunk for chunks in chunks_per_document for chunk in chunks]
 
-class EmbeddingHandlerFactory:
-    @staticmethod
-    def create_handler(data_category: DataCategory) -> EmbeddingDataHandler:
-        if data_category == DataCategory.QUERIES:
-            return QueryEmbeddingHandler()
-        if data_category == DataCategory.POSTS:
-            return PostEmbeddingHandler()
-        elif data_category == DataCategory.ARTICLES:
-            return ArticleEmbeddingHandler()
-        elif data_category == DataCategory.REPOSITORIES:
-            return RepositoryEmbeddingHandler()
-        else:
-            raise ValueError("Unsupported data type")
+
+class EmbeddingHandlerFactory(HandlerFactory[EmbeddingDataHandler]):
+    _registry = {
+        DataCategory.QUERIES: QueryEmbeddingHandler,
+        DataCategory.POSTS: PostEmbeddingHandler,
+        DataCategory.ARTICLES: ArticleEmbeddingHandler,
+        DataCategory.REPOSITORIES: RepositoryEmbeddingHandler,
+    }
 
 
 class EmbeddingDispatcher:
@@ -112,24 +175,72 @@ class EmbeddingDispatcher:
     def dispatch(
         cls, data_model: VectorBaseDocument | list[VectorBaseDocument]
     ) -> EmbeddedChunk | list[EmbeddedChunk]:
-        is_list = isinstance(data_model, list)
-        if not is_list:
-            data_model = [data_model]
+        if isinstance(data_model, list):
+            return cls.dispatch_many(data_model)
 
-        if len(data_model) == 0:
-            return []
+        return cls.dispatch_many([data_model])[0]
 
-        data_category = data_model[0].get_category()
-        assert all(
-            data_model.get_category() == data_category for data_model in data_model
-        ), "Data models must be of the same category"
-        handler = cls.factory.create_handler(data_category)
+    @classmethod
+    @metrics.timed("embedding.dispatch_many", items=len)
+    def dispatch_many(
+        cls, data_models: list[VectorBaseDocument]
+    ) -> list[EmbeddedChunk]:
+        """
+        Embed chunks of any categories with a single model call, then map them to
+        their category-specific embedded types. Results are in input order.
+
+        If the batch fails, its chunks are embedded one by one instead: the ones
+        the model still fails on are left out and counted in `embedding.failed`.
+        """
+
+        if len(data_models) == 0:
+            return []
 
-        embedded_chunk_model = handler.embed_batch(data_model)
+        embeddings = embed_contents(data_models)
+        if len(embeddings) != len(data_models):
+            logger.warning(
+                "Failed to embed batch, retrying chunk by chunk", num=len(data_models)
+            )
+            data_models, embeddings = cls._embed_one_by_one(data_models)
+            if len(data_models) == 0:
+                return []
+
+        embedded_chunk_models: list[Any] = [None] * len(data_models)
+        groups = _group_by_category(
+            data_models, lambda data_model: data_model.get_category()
+        )
+        for data_category, indices in groups.items():
+            handler = cls.factory.create_handler(data_category)
+            embedded_models = handler.map_batch(
+                [data_models[i] for i in indices], [embeddings[i] for i in indices]
+            )
+            for i, embedded_model in zip(indices, embedded_models, strict=True):
+                embedded_chunk_models[i] = embedded_model
 
-        if not is_list:
-            embedded_chunk_model = embedded_chunk_model[0]
+        logger.info(
+            "Data embedded successfully",
+            data_categories=list(groups),
+            num=len(data_models),
+        )
 
-        logger.info("Data embedded successfully", data_category=data_category)
+        return embedded_chunk_models
 
-        return embedded_chunk_model
+    @staticmethod
+    def _embed_one_by_one(
+        data_models: list[VectorBaseDocument],
+    ) -> tuple[list[VectorBaseDocument], list]:
+        embedded_data_models, embeddings = [], []
+        for data_model in data_models:
+            embedding = embed_contents([data_model])
+            if len(embedding) == 1:
+                embedded_data_models.append(data_model)
+                embeddings.append(embedding[0])
+            else:
+                metrics.increment("embedding.failed")
+                logger.error(
+                    "Failed to embed chunk",
+                    id=str(data_model.id),
+                    document_id=str(getattr(data_model, "document_id", None)),
+                )
+
+        return embedded_data_models, embeddings
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, cast
+from typing import Generic, TypeVar
+
+from numpy.typing import NDArray
+import numpy as np
 
 from llmeng.app.networks.embeddings import EmbeddingModelSingleton
 from llmeng.domain.chunks import ArticleChunk, Chunk, PostChunk, RepositoryChunk
@@ -18,28 +21,47 @@ EmbeddedChunkT = TypeVar("EmbeddedChunkT", bound=EmbeddedChunk)
 embedding_model = EmbeddingModelSingleton()
 
 
+def embed_contents(data_models: list[Chunk]) -> NDArray[np.float32]:
+    """Embed the chunks' contents in one model call, as a (batch, dim) matrix."""
+
+    embedding_model_input = [data_model.content for data_model in data_models]
+
+    return embedding_model(
+        embedding_model_input, to_list=False, batch_size=len(embedding_model_input)
+    )
+
+
 class EmbeddingDataHandler(ABC, Generic[ChunkT, EmbeddedChunkT]):
     @abstractmethod
-    def map_model(self, data_model: ChunkT, embedding: list[float]) -> EmbeddedChunkT:
+    def map_model(
+        self, data_model: ChunkT, embedding: NDArray[np.float32]
+    ) -> EmbeddedChunkT:
         pass
 
     def embed_batch(self, data_model: list[ChunkT]) -> list[EmbeddedChunkT]:
-        embedding_model_input = [data_model.content for data_model in data_model]
-        embeddings = embedding_model(embedding_model_input, to_list=True)
-
-        embedded_chunk = [
-            self.map_model(data_model, cast(list[float], embedding))
-            for data_model, embedding in zip(data_model, embeddings, strict=False)
+        # A single (batch, dim) float32 matrix; each chunk keeps a row view of it.
+        embeddings = embed_contents(data_model)
+
+        return self.map_batch(data_model, embeddings)
+
+    def map_batch(
+        self,
+        data_models: list[ChunkT],
+        embeddings: NDArray[np.float32] | list[NDArray[np.float32]],
+    ) -> list[EmbeddedChunkT]:
+        return [
+            self.map_model(data_model, embedding)
+            for data_model, embedding in zip(data_models, embeddings, strict=False)
         ]
 
-        return embedded_chunk
-
     def embed(self, data_model: ChunkT) -> EmbeddedChunkT:
         return self.embed_batch([data_model])[0]
 
 
 class QueryEmbeddingHandler(EmbeddingDataHandler):
-    def map_model(self, data_model: Query, embedding: list[float]) -> EmbeddedQuery:
+    def map_model(
+        self, data_model: Query, embedding: NDArray[np.float32]
+    ) -> EmbeddedQuery:
         return EmbeddedQuery(
             id=data_model.id,
             author_id=data_model.author_id,
@@ -56,7 +78,7 @@ class QueryEmbeddingHandler(EmbeddingDataHandler):
 
 class PostEmbeddingHandler(EmbeddingDataHandler):
     def map_model(
-        self, data_model: PostChunk, embedding: list[float]
+        self, data_model: PostChunk, embedding: NDArray[np.float32]
     ) -> EmbeddedPostChunk:
         return EmbeddedPostChunk(
             id=data_model.id,
@@ -76,7 +98,7 @@ class PostEmbeddingHandler(EmbeddingDataHandler):
 
 class ArticleEmbeddingHandler(EmbeddingDataHandler):
     def map_model(
-        self, data_model: ArticleChunk, embedding: list[float]
+        self, data_model: ArticleChunk, embedding: NDArray[np.float32]
     ) -> EmbeddedArticleChunk:
         return EmbeddedArticleChunk(
             id=data_model.id,
@@ -97,7 +119,7 @@ class ArticleEmbeddingHandler(EmbeddingDataHandler):
 
 class RepositoryEmbeddingHandler(EmbeddingDataHandler):
     def map_model(
-        self, data_model: RepositoryChunk, embedding: list[float]
+        self, data_model: RepositoryChunk, embedding: NDArray[np.float32]
     ) -> EmbeddedRepositoryChunk:
         return EmbeddedRepositoryChunk(
             id=data_model.id,
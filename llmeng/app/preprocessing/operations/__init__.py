@@ -1,4 +1,11 @@
-from .cleaning import clean_text
-from .chunking import chunk_text, chunk_article
+from .cleaning import clean_and_join, clean_batch, clean_text
+from .chunking import chunk_text, chunk_article, iter_article_chunks
 
-__all__ = ["clean_text", "chunk_text", "chunk_article"]
+__all__ = [
+    "clean_text",
+    "clean_batch",
+    "clean_and_join",
+    "chunk_text",
+    "chunk_article",
+    "iter_article_chunks",
+]
@@ -1,50 +1,141 @@
+from functools import lru_cache
 import re
-
-from langchain.text_splitter import (
-    RecursiveCharacterTextSplitter,
-    SentenceTransformersTokenTextSplitter,
-)
+from typing import TYPE_CHECKING, Iterator
 
 from llmeng.app.networks.embeddings import EmbeddingModelSingleton
+from llmeng.metrics import metrics
+
+if TYPE_CHECKING:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 embedding_model = EmbeddingModelSingleton()
 
 
-def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 50) -> list[str]:
-    char_splitter = RecursiveCharacterTextSplitter(
+@lru_cache(maxsize=None)
+def _get_character_splitter(chunk_size: int) -> "RecursiveCharacterTextSplitter":
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
         separators=["\n\n"], chunk_size=chunk_size, chunk_overlap=0
     )
-    text_split_by_characters = char_splitter.split_text(text)
-    token_splitter = SentenceTransformersTokenTextSplitter(
-        chunk_overlap=chunk_overlap,
-        tokens_per_chunk=embedding_model.max_input_length,
-        model_name=embedding_model.model_id,
-    )
-    chunks_by_tokens = []
-    for section in text_split_by_characters:
-        chunks_by_tokens.extend(token_splitter.split_text(section))
 
-    return chunks_by_tokens
 
+def _split_token_ids(
+    input_ids: list[int], tokens_per_chunk: int, chunk_overlap: int
+) -> list[list[int]]:
+    """Cut token ids into windows of `tokens_per_chunk` that overlap by `chunk_overlap`."""
 
-def chunk_article(text: str, min_length: int, max_length: int) -> list[str]:
-    sentences = re.split(r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s", text)
+    windows = []
+    start_idx = 0
+    while start_idx < len(input_ids):
+        cur_idx = min(start_idx + tokens_per_chunk, len(input_ids))
+        windows.append(input_ids[start_idx:cur_idx])
+        if cur_idx == len(input_ids):
+            break
+        start_idx += tokens_per_chunk - chunk_overlap
+
+    return windows
+
+
+def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 50) -> list[str]:
+    """
+    Split `text` on paragraphs into sections of at most `chunk_size` characters,
+    then cut each section into windows of the embedding model's max input length
+    (in tokens) overlapping by `chunk_overlap` tokens.
+
+    Produces the same chunks as chaining langchain's RecursiveCharacterTextSplitter
+    and SentenceTransformersTokenTextSplitter, but reuses the splitter and the
+    tokenizer across calls and encodes/decodes all sections in one batch each.
+    """
+
+    tokens_per_chunk = embedding_model.max_input_length
+    if chunk_overlap >= tokens_per_chunk:
+        raise ValueError(
+            f"chunk_overlap={chunk_overlap} must be smaller than the model's "
+            f"max input length ({tokens_per_chunk} tokens)."
+        )
+
+    sections = _get_character_splitter(chunk_size).split_text(text)
+    if not sections:
+        return []
+
+    tokenizer = embedding_model.tokenizer
+    with metrics.timer("chunking.tokenize", items=len(sections)) as span:
+        encoded_sections = tokenizer(
+            sections,
+            add_special_tokens=True,
+            truncation=False,
+            verbose=False,
+        )["input_ids"]
+
+        windows = []
+        for input_ids in encoded_sections:
+            # Drop the start and stop special tokens, like the langchain splitter.
+            windows.extend(
+                _split_token_ids(input_ids[1:-1], tokens_per_chunk, chunk_overlap)
+            )
+
+        chunks = tokenizer.batch_decode(windows)
+        span.tokens = sum(len(input_ids) for input_ids in encoded_sections)
 
-    extracts = []
-    current_chunk = ""
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
+    return chunks
+
+
+# A sentence ends at a whitespace that follows ".", "?" or "!", unless the
+# period belongs to an abbreviation like "e.g." or "Mr.". The cheap
+# end-of-sentence lookbehind comes first so most positions fail immediately.
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.?!])(?<!\w\.\w.)(?<![A-Z][a-z]\.)\s")
+
+
+def iter_sentence_spans(text: str) -> Iterator[tuple[int, int]]:
+    """Lazily yield the (start, end) offsets of the non-empty, stripped sentences."""
+
+    start = 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        yield from _strip_span(text, start, boundary.start())
+        start = boundary.end()
+
+    yield from _strip_span(text, start, len(text))
+
+
+def _strip_span(text: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+
+    if start < end:
+        yield start, end
+
+
+def iter_article_chunks(text: str, min_length: int, max_length: int) -> Iterator[str]:
+    """
+    Lazily group sentences into chunks of at most `max_length` characters,
+    dropping chunks shorter than `min_length`.
+
+    Sentences are tracked as offsets into `text` and only sliced out when a
+    chunk is emitted, so the work is linear in the size of the text and memory
+    is bounded by a single chunk.
+    """
+
+    spans: list[tuple[int, int]] = []
+    # Length of the chunk as if every sentence was followed by a space.
+    chunk_length = 0
+    for start, end in iter_sentence_spans(text):
+        sentence_length = end - start
+        if chunk_length + sentence_length <= max_length:
+            spans.append((start, end))
+            chunk_length += sentence_length + 1
             continue
 
-        if len(current_chunk) + len(sentence) <= max_length:
-            current_chunk += sentence + " "
-        else:
-            if len(current_chunk) >= min_length:
-                extracts.append(current_chunk.strip())
-            current_chunk = sentence + " "
+        if chunk_length >= min_length:
+            yield " ".join(text[s:e] for s, e in spans)
+        spans = [(start, end)]
+        chunk_length = sentence_length + 1
+
+    if chunk_length >= min_length:
+        yield " ".join(text[s:e] for s, e in spans)
 
-    if len(current_chunk) >= min_length:
-        extracts.append(current_chunk.strip())
 
-    return extracts
+def chunk_article(text: str, min_length: int, max_length: int) -> list[str]:
+    return list(iter_article_chunks(text, min_length, max_length))
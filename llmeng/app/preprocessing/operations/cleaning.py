@@ -1,8 +1,31 @@
+from typing import Iterable
 import re
 
+# Any run of characters that are neither word characters nor basic punctuation
+# (whitespace included) becomes a single space. This does in one pass what
+# replacing the unwanted characters with spaces and then collapsing whitespace
+# does in two.
+_UNWANTED_RUN = re.compile(r"[^\w.,!?]+")
+
 
 def clean_text(text: str) -> str:
-    text = re.sub(r"[^\w\s.,!?]", " ", text)
-    text = re.sub(r"\s+", " ", text)
+    return _UNWANTED_RUN.sub(" ", text).strip()
+
+
+def clean_batch(texts: Iterable[str]) -> list[str]:
+    """Clean every text, in order."""
+
+    sub = _UNWANTED_RUN.sub
+
+    return [sub(" ", text).strip() for text in texts]
+
+
+def clean_and_join(texts: Iterable[str]) -> str:
+    """
+    Clean the texts and join the non-empty results with a space.
+
+    Same result as `clean_text(" #### ".join(texts))` (the separator is cleaned
+    away), without first building the concatenated document.
+    """
 
-    return text.strip()
+    return " ".join(text for text in clean_batch(texts) if text)
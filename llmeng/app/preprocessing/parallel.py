@@ -0,0 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Callable, Optional, TypeVar
+
+from loguru import logger
+
+from llmeng.app.networks.embeddings import EmbeddingModelSingleton
+
+InputT = TypeVar("InputT")
+OutputT = TypeVar("OutputT")
+
+
+def preload_tokenizer() -> None:
+    """Process pool initializer: load the chunking tokenizer once per worker."""
+
+    embedding_model = EmbeddingModelSingleton()
+    _ = embedding_model.tokenizer
+    _ = embedding_model.max_input_length
+
+
+def parallel_map(
+    func: Callable[[InputT], OutputT],
+    items: list[InputT],
+    num_workers: int = 1,
+    chunk_size: int = 16,
+    initializer: Optional[Callable[[], None]] = None,
+) -> list[OutputT]:
+    """
+    Apply `func` to every item, returning the results in input order.
+
+    With `num_workers > 1` the items are sent to a process pool in work units of
+    `chunk_size` items, which sidesteps the GIL for CPU-bound cleaning and
+    tokenization. `func` and the items must be picklable. Workers are spawned
+    (not forked) so they don't inherit tokenizer threads or open connections.
+    """
+
+    if num_workers <= 1 or len(items) <= chunk_size:
+        return [func(item) for item in items]
+
+    logger.info(
+        f"Processing {len(items)} items with {num_workers} worker processes",
+        chunk_size=chunk_size,
+    )
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+    ) as executor:
+        return list(executor.map(func, items, chunksize=chunk_size))
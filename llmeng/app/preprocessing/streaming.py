@@ -0,0 +1,122 @@
+from collections import Counter
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Any, Callable, Iterable, Iterator
+
+from loguru import logger
+
+Stage = Callable[[Iterator[Any]], Iterator[Any]]
+
+_DONE = object()
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class StreamingPipeline:
+    """
+    Runs a chain of stages concurrently, one thread per stage, connected by
+    bounded queues.
+
+    A stage is a generator function that consumes an iterator of items (usually
+    batches) from the previous stage and yields items to the next one. Because
+    every queue holds at most `queue_size` items, a slow stage applies
+    backpressure upstream and memory stays bounded no matter how large the
+    source is. If a stage fails, the other stages are cancelled and the error
+    is re-raised by `run()`.
+    """
+
+    def __init__(self, stages: list[tuple[str, Stage]], queue_size: int = 4) -> None:
+        self._stages = stages
+        self._queue_size = queue_size
+        self._stop = Event()
+        self._errors: list[tuple[str, BaseException]] = []
+
+        self.items_out: Counter[str] = Counter()
+
+    def run(self, source: Iterable[Any]) -> None:
+        queues = [Queue(maxsize=self._queue_size) for _ in self._stages]
+        threads = [Thread(target=self._produce, args=(source, queues[0]), daemon=True)]
+        for i, (name, stage) in enumerate(self._stages):
+            output = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(
+                Thread(
+                    target=self._run_stage,
+                    args=(name, stage, queues[i], output),
+                    name=f"stage-{name}",
+                    daemon=True,
+                )
+            )
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            name, error = self._errors[0]
+            logger.error(f"Streaming stage '{name}' failed: {error}")
+
+            raise error
+
+    def _produce(self, source: Iterable[Any], output: Queue) -> None:
+        try:
+            for item in source:
+                self._put(output, item)
+                self.items_out["source"] += 1
+        except _Cancelled:
+            pass
+        except BaseException as error:
+            self._fail("source", error)
+        finally:
+            self._put_done(output)
+
+    def _run_stage(
+        self, name: str, stage: Stage, input: Queue, output: Queue | None
+    ) -> None:
+        try:
+            for item in stage(self._consume(input)):
+                if output is not None:
+                    self._put(output, item)
+                self.items_out[name] += 1
+        except _Cancelled:
+            pass
+        except BaseException as error:
+            self._fail(name, error)
+        finally:
+            if output is not None:
+                self._put_done(output)
+
+    def _consume(self, input: Queue) -> Iterator[Any]:
+        while True:
+            try:
+                item = input.get(timeout=0.1)
+            except Empty:
+                if self._stop.is_set():
+                    raise _Cancelled()
+                continue
+
+            if item is _DONE:
+                return
+            yield item
+
+    def _put(self, output: Queue, item: Any) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled()
+            try:
+                output.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+
+    def _put_done(self, output: Queue) -> None:
+        try:
+            self._put(output, _DONE)
+        except _Cancelled:
+            pass
+
+    def _fail(self, name: str, error: BaseException) -> None:
+        self._errors.append((name, error))
+        self._stop.set()
@@ -0,0 +1,44 @@
+from loguru import logger
+
+from llmeng.app.networks.embeddings import CrossEncoderModelSingleton
+from llmeng.domain.embedded_chunks import EmbeddedChunk
+from llmeng.domain.queries import Query
+
+
+class Reranker:
+    """
+    Second retrieval stage: re-score the first-stage (vector search) candidates
+    with a cross-encoder and keep the best ones.
+
+    Only the first `max_candidates` candidates are sent to the cross-encoder, so
+    its cost is bounded no matter how many chunks the vector search returned.
+    """
+
+    def __init__(self, max_candidates: int = 50) -> None:
+        self._model = CrossEncoderModelSingleton()
+        self._max_candidates = max_candidates
+
+    def generate(
+        self, query: Query, chunks: list[EmbeddedChunk], keep_top_k: int
+    ) -> list[EmbeddedChunk]:
+        candidates = chunks[: self._max_candidates]
+        if not candidates:
+            return []
+
+        query_doc_tuples = [(query.content, chunk.content) for chunk in candidates]
+        scores = self._model(query_doc_tuples)
+
+        scored_query_doc_tuples = sorted(
+            zip(scores, candidates, strict=False),
+            key=lambda scored: scored[0],
+            reverse=True,
+        )
+        reranked_documents = [doc for _, doc in scored_query_doc_tuples[:keep_top_k]]
+
+        logger.info(
+            "Chunks reranked",
+            num_candidates=len(candidates),
+            num_kept=len(reranked_documents),
+        )
+
+        return reranked_documents
@@ -1,6 +1,6 @@
 import uuid
 from abc import ABC
-from typing import Generic, Type, TypeVar, Protocol
+from typing import Generic, Iterator, Type, TypeVar, Protocol
 from typing_extensions import ClassVar
 import sqlite3
 import json
@@ -8,6 +8,7 @@ import json
 from loguru import logger
 from pydantic import UUID4, BaseModel, Field
 
+from llmeng.metrics import metrics
 from llmeng.nosql import db
 
 
@@ -68,6 +69,7 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
         return (str(self.id), self.get_collection_name(), json.dumps(parsed))
 
     # def save(self: T, **kwargs) -> T | None:
+    @metrics.timed("nosql.save")
     def save(self: T, **kwargs) -> T:
         """Save the document to SQLite."""
         try:
@@ -90,30 +92,14 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             raise
 
     @classmethod
+    @metrics.timed("nosql.find")
     def find(cls: Type[T], **filter_options) -> T | None:
         """Find a single document matching the filter options."""
         try:
             with db.get_connection() as conn:
                 cursor = conn.cursor()
 
-                # Convert filter options to JSON query conditions
-                conditions = []
-                params = [cls.get_collection_name()]
-
-                for key, value in filter_options.items():
-                    if isinstance(value, uuid.UUID):
-                        value = str(value)
-                    conditions.append(f"json_extract(data, '$.{key}') = ?")
-                    params.append(value)
-
-                query = """
-                    SELECT data FROM documents 
-                    WHERE collection = ?
-                """
-
-                if conditions:
-                    query += " AND " + " AND ".join(conditions)
-
+                query, params = cls._build_select(**filter_options)
                 cursor.execute(query, params)
                 result = cursor.fetchone()
 
@@ -125,6 +111,30 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             logger.error(f"Failed to retrieve document: {e}")
             return None
 
+    @classmethod
+    def _build_select(cls: Type[T], **filter_options) -> tuple[str, list]:
+        """Build the SELECT query and params matching the filter options."""
+
+        # Convert filter options to JSON query conditions
+        conditions = []
+        params = [cls.get_collection_name()]
+
+        for key, value in filter_options.items():
+            if isinstance(value, uuid.UUID):
+                value = str(value)
+            conditions.append(f"json_extract(data, '$.{key}') = ?")
+            params.append(value)
+
+        query = """
+            SELECT data, _id FROM documents 
+            WHERE collection = ?
+        """
+
+        if conditions:
+            query += " AND " + " AND ".join(conditions)
+
+        return query, params
+
     @classmethod
     def get_or_create(cls: Type[T], **filter_options) -> T:
         """Get an existing document or create a new one."""
@@ -156,7 +166,10 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
     def bulk_insert(cls: Type[T], documents: list[T], **kwargs) -> bool:
         """Insert multiple documents at once."""
         try:
-            with db.get_connection() as conn:
+            with (
+                metrics.timer("nosql.bulk_insert", items=len(documents)),
+                db.get_connection() as conn,
+            ):
                 cursor = conn.cursor()
                 values = [doc.to_sqlite(**kwargs) for doc in documents]
 
@@ -176,30 +189,14 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             return False
 
     @classmethod
+    @metrics.timed("nosql.bulk_find", items=len)
     def bulk_find(cls: Type[T], **filter_options) -> list[T]:
         """Find all documents matching the filter options."""
         try:
             with db.get_connection() as conn:
                 cursor = conn.cursor()
 
-                # Convert filter options to JSON query conditions
-                conditions = []
-                params = [cls.get_collection_name()]
-
-                for key, value in filter_options.items():
-                    if isinstance(value, uuid.UUID):
-                        value = str(value)
-                    conditions.append(f"json_extract(data, '$.{key}') = ?")
-                    params.append(value)
-
-                query = """
-                    SELECT data FROM documents 
-                    WHERE collection = ?
-                """
-
-                if conditions:
-                    query += " AND " + " AND ".join(conditions)
-
+                query, params = cls._build_select(**filter_options)
                 cursor.execute(query, params)
                 results = cursor.fetchall()
 
@@ -212,3 +209,37 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
         except sqlite3.Error as e:
             logger.error(f"Failed to retrieve documents: {e}")
             return []
+
+    @classmethod
+    def iter_find(
+        cls: Type[T], batch_size: int = 100, **filter_options
+    ) -> Iterator[list[T]]:
+        """
+        Stream the documents matching the filter options in batches of
+        `batch_size`, without loading the whole result set in memory.
+
+        Each batch is a separate keyset query (by `_id`) on its own connection:
+        no read statement stays open while the caller processes a batch, which
+        would make every other connection's writes fail with "database is
+        locked".
+        """
+        query, params = cls._build_select(**filter_options)
+        query += " AND _id > ? ORDER BY _id LIMIT ?"
+
+        last_id = ""
+        while True:
+            try:
+                with db.get_connection() as conn:
+                    results = conn.execute(
+                        query, [*params, last_id, batch_size]
+                    ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to retrieve documents: {e}")
+
+                return
+
+            if not results:
+                return
+
+            last_id = results[-1][1]
+            yield [cls.from_sqlite({"data": result[0]}) for result in results]
@@ -5,13 +5,23 @@ import uuid
 from loguru import logger
 from pydantic import UUID4, BaseModel, Field
 from qdrant_client.http import exceptions
-from qdrant_client.http.models import Distance, PointStruct, VectorParams
+from qdrant_client.http.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    MatchAny,
+    PointStruct,
+    VectorParams,
+)
 import numpy as np
 
 from llmeng.app.networks.embeddings import EmbeddingModelSingleton
 from llmeng.domain.exceptions import ImproperlyConfigured
 from llmeng.domain.types import DataCategory
-from llmeng.infra.qdrant import connection
+from llmeng.infra.qdrant import QdrantDatabaseConnector
+from llmeng.metrics import metrics
 
 T = TypeVar("T", bound="VectorBaseDocument")
 
@@ -21,8 +31,11 @@ class VectorBaseDocument(BaseModel, Generic[T], ABC):
 
     @classmethod
     def _bulk_insert(cls: Type[T], documents: list["VectorBaseDocument"]) -> None:
-        points = [doc.to_point() for doc in documents]
-        connection.upsert(collection_name=cls.get_collection_name(), points=points)
+        with metrics.timer("vector.bulk_insert", items=len(documents)):
+            points = [doc.to_point() for doc in documents]
+            QdrantDatabaseConnector().upsert(
+                collection_name=cls.get_collection_name(), points=points
+            )
 
     @classmethod
     def _create_collection(
@@ -35,7 +48,7 @@ class VectorBaseDocument(BaseModel, Generic[T], ABC):
         else:
             vectors_config = {}
 
-        return connection.create_collection(
+        return QdrantDatabaseConnector().create_collection(
             collection_name=collection_name, vectors_config=vectors_config
         )
 
@@ -75,6 +88,31 @@ class VectorBaseDocument(BaseModel, Generic[T], ABC):
 
         return True
 
+    @classmethod
+    def delete_stale(
+        cls: Type[T], document_ids: list[str], keep_ids: list[str]
+    ) -> None:
+        """
+        Delete the points of the source documents `document_ids` (matched on
+        their `document_id` payload) whose ID isn't in `keep_ids`, e.g. the
+        chunks of files removed from a refreshed repository.
+        """
+
+        with metrics.timer("vector.delete_stale", items=len(document_ids)):
+            QdrantDatabaseConnector().delete(
+                collection_name=cls.get_collection_name(),
+                points_selector=FilterSelector(
+                    filter=Filter(
+                        must=[
+                            FieldCondition(
+                                key="document_id", match=MatchAny(any=document_ids)
+                            )
+                        ],
+                        must_not=[HasIdCondition(has_id=keep_ids)],
+                    )
+                ),
+            )
+
     @classmethod
     def create_collection(cls: Type[T]) -> bool:
         collection_name = cls.get_collection_name()
@@ -117,12 +155,17 @@ class VectorBaseDocument(BaseModel, Generic[T], ABC):
     def to_point(self: T, **kwargs) -> PointStruct:
         exclude_unset = kwargs.pop("exclude_unset", False)
         by_alias = kwargs.pop("by_alias", True)
+        exclude = set(kwargs.pop("exclude", None) or ()) | {"embedding"}
         payload = self.model_dump(
-            exclude_unset=exclude_unset, by_alias=by_alias, **kwargs
+            exclude_unset=exclude_unset, by_alias=by_alias, exclude=exclude, **kwargs
         )
         _id = str(payload.pop("id"))
-        vector = payload.pop("embedding", {})
-        if vector and isinstance(vector, np.ndarray):
+        # Embeddings stay float32 arrays until here; they are only boxed into
+        # Python floats at the Qdrant boundary.
+        vector = getattr(self, "embedding", None)
+        if vector is None:
+            vector = {}
+        elif isinstance(vector, np.ndarray):
             vector = vector.tolist()
 
         return PointStruct(id=_id, vector=vector, payload=payload)
@@ -36,6 +36,8 @@ class ArticleDocument(Document):
 class RepositoryDocument(Document):
     name: str
     link: str
+    # HEAD commit the content was read from, for incremental refreshes.
+    commit_sha: str | None = None
 
     class Settings:
         name = DataCategory.REPOSITORIES
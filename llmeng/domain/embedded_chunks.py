@@ -2,14 +2,14 @@ from abc import ABC
 
 from pydantic import UUID4, Field
 
-from llmeng.domain.types import DataCategory
+from llmeng.domain.types import DataCategory, Embedding
 
 from .base import VectorBaseDocument
 
 
 class EmbeddedChunk(VectorBaseDocument, ABC):
     content: str
-    embedding: list[float] | None
+    embedding: Embedding | None
     platform: str
     document_id: UUID4
     author_id: UUID4
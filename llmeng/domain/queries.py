@@ -1,7 +1,7 @@
 from pydantic import UUID4, Field
 
 from llmeng.domain.base import VectorBaseDocument
-from llmeng.domain.types import DataCategory
+from llmeng.domain.types import DataCategory, Embedding
 
 
 class Query(VectorBaseDocument):
@@ -28,7 +28,7 @@ class Query(VectorBaseDocument):
 
 
 class EmbeddedQuery(Query):
-    embedding: list[float]
+    embedding: Embedding
 
     class Config(Query.Config):
         category = DataCategory.QUERIES
@@ -1,4 +1,9 @@
 from enum import StrEnum
+from typing import Annotated
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import PlainSerializer, PlainValidator, WithJsonSchema
 
 
 class DataCategory(StrEnum):
@@ -13,3 +18,24 @@ class DataCategory(StrEnum):
     POSTS = "posts"
     ARTICLES = "articles"
     REPOSITORIES = "repositories"
+
+
+def _to_float32_array(value) -> NDArray[np.float32]:
+    """Accept lists or arrays; arrays that are already float32 are kept as-is (no copy)."""
+
+    return np.asarray(value, dtype=np.float32)
+
+
+def _to_float_list(value: NDArray[np.float32]) -> list[float]:
+    return value.tolist()
+
+
+# A compact, array-backed embedding vector. In Python mode the field holds a
+# float32 ndarray (often a row view into a batch matrix); it is only turned into
+# a list of floats when serialized to JSON, which is also its JSON schema.
+Embedding = Annotated[
+    NDArray[np.float32],
+    PlainValidator(_to_float32_array),
+    PlainSerializer(_to_float_list, return_type=list[float], when_used="json"),
+    WithJsonSchema({"type": "array", "items": {"type": "number"}}),
+]
@@ -0,0 +1,156 @@
+import importlib
+import json
+from typing import Any, Iterator, Type
+import uuid
+
+import numpy as np
+import pyarrow as pa
+from pydantic import BaseModel
+
+CLASS_COLUMN = "_document_class"
+_JSON_COLUMNS_KEY = b"llmeng.json_columns"
+
+
+def _class_path(model_class: Type[BaseModel]) -> str:
+    return f"{model_class.__module__}:{model_class.__qualname__}"
+
+
+def _load_class(path: str) -> Type[BaseModel]:
+    module_name, qualname = path.split(":")
+    obj: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+
+    return obj
+
+
+def _vector_column(values: list[Any]) -> pa.Array:
+    """
+    Stack ndarray values into a fixed-size float32 list column. Parquet can't
+    round-trip nulls inside fixed-size lists, so a column with missing vectors
+    falls back to a variable-size list.
+    """
+
+    dims = {value.shape[-1] for value in values if value is not None}
+    if len(dims) != 1:
+        raise ValueError(f"Vector column needs a single dimension, got {dims}")
+    (dim,) = dims
+
+    present = [value for value in values if value is not None]
+    flat = pa.array(np.stack(present).astype(np.float32, copy=False).reshape(-1))
+    if len(present) == len(values):
+        return pa.FixedSizeListArray.from_arrays(flat, dim)
+
+    offsets = np.cumsum([0] + [0 if value is None else dim for value in values])
+    mask = pa.array([value is None for value in values])
+
+    return pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), flat, mask=mask)
+
+
+def _to_column(values: list[Any]) -> tuple[pa.Array, bool]:
+    """Build the Arrow column for a field. Returns (column, is_json)."""
+
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, np.ndarray) for value in present):
+        return _vector_column(values), False
+    if any(isinstance(value, (dict, list)) for value in present):
+        return pa.array([None if v is None else json.dumps(v) for v in values]), True
+    if any(isinstance(value, uuid.UUID) for value in present):
+        return pa.array([None if v is None else str(v) for v in values]), False
+
+    return pa.array(values), False
+
+
+def documents_to_table(documents: list[BaseModel]) -> pa.Table:
+    """
+    Convert a (possibly heterogeneous) list of pydantic documents into one Arrow
+    table: a column per field (the union over all classes, null where a class
+    doesn't have the field), plus a dictionary-encoded column with each row's
+    class. ndarray fields, i.e. embeddings, become float32 list columns.
+    """
+
+    for document in documents:
+        if not isinstance(document, BaseModel):
+            raise TypeError(f"Expected pydantic models, got {type(document)}")
+
+    field_names: dict[str, None] = {}
+    for model_class in dict.fromkeys(type(document) for document in documents):
+        field_names.update(dict.fromkeys(model_class.model_fields))
+
+    rows = [dict(document) for document in documents]
+    columns = {
+        CLASS_COLUMN: pa.array(
+            [_class_path(type(document)) for document in documents], pa.string()
+        ).dictionary_encode()
+    }
+    json_columns = []
+    for name in field_names:
+        columns[name], is_json = _to_column([row.get(name) for row in rows])
+        if is_json:
+            json_columns.append(name)
+
+    table = pa.table(columns)
+
+    return table.replace_schema_metadata(
+        {_JSON_COLUMNS_KEY: json.dumps(json_columns).encode()}
+    )
+
+
+def _column_values(table: pa.Table, name: str, json_columns: set[str]) -> list[Any]:
+    column = table.column(name).combine_chunks()
+    if pa.types.is_fixed_size_list(column.type) or (
+        pa.types.is_list(column.type) and pa.types.is_float32(column.type.value_type)
+    ):
+        is_null = column.is_null().to_numpy(zero_copy_only=False)
+        # A zero-copy view of the (memory mapped) buffer when there are no nulls.
+        flat = column.flatten().to_numpy(zero_copy_only=False)
+        num_vectors = len(column) - int(is_null.sum())
+        if num_vectors == 0:
+            return [None] * len(column)
+
+        rows = iter(flat.reshape(num_vectors, -1))
+
+        return [None if null else next(rows) for null in is_null]
+    if name in json_columns:
+        return [None if v is None else json.loads(v) for v in column.to_pylist()]
+
+    return column.to_pylist()
+
+
+def table_to_documents(table: pa.Table) -> list[BaseModel]:
+    """Inverse of `documents_to_table`."""
+
+    metadata = table.schema.metadata or {}
+    json_columns = set(json.loads(metadata.get(_JSON_COLUMNS_KEY, b"[]")))
+
+    class_paths = table.column(CLASS_COLUMN).to_pylist()
+    classes = {path: _load_class(path) for path in set(class_paths)}
+    columns = {
+        name: _column_values(table, name, json_columns)
+        for name in table.column_names
+        if name != CLASS_COLUMN
+    }
+
+    documents = []
+    for i, path in enumerate(class_paths):
+        model_class = classes[path]
+        documents.append(
+            model_class.model_validate(
+                {
+                    name: columns[name][i]
+                    for name in model_class.model_fields
+                    if name in columns
+                }
+            )
+        )
+
+    return documents
+
+
+def iter_batches_as_documents(
+    batches: Iterator[pa.RecordBatch],
+) -> Iterator[list[BaseModel]]:
+    """Decode record batches lazily, e.g. from `ParquetFile.iter_batches()`."""
+
+    for batch in batches:
+        yield table_to_documents(pa.Table.from_batches([batch]))
@@ -1,15 +1,21 @@
+from typing import TYPE_CHECKING
+
 from loguru import logger
-from qdrant_client import QdrantClient
-from qdrant_client.http.exceptions import UnexpectedResponse
 
 from llmeng.settings import settings
 
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
 
 class QdrantDatabaseConnector:
-    _instance: QdrantClient | None = None
+    _instance: "QdrantClient | None" = None
 
-    def __new__(cls, *args, **kwargs) -> QdrantClient:
+    def __new__(cls, *args, **kwargs) -> "QdrantClient":
         if cls._instance is None:
+            from qdrant_client import QdrantClient
+            from qdrant_client.http.exceptions import UnexpectedResponse
+
             try:
                 if settings.USE_QDRANT_CLOUD:
                     cls._instance = QdrantClient(
@@ -40,4 +46,9 @@ class QdrantDatabaseConnector:
         return cls._instance
 
 
-connection = QdrantDatabaseConnector()
+def __getattr__(name: str):
+    # `connection` is created on first access rather than at import time.
+    if name == "connection":
+        return QdrantDatabaseConnector()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
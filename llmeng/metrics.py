@@ -0,0 +1,198 @@
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import functools
+import inspect
+import json
+from pathlib import Path
+from threading import Lock
+import time
+from typing import Any, Callable, Iterator, TypeVar
+
+import numpy as np
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    """A single timed call. `items` and `tokens` can be set inside the block."""
+
+    items: int | None = None
+    tokens: int | None = None
+
+
+@dataclass
+class _Timing:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    items: int = 0
+    tokens: int = 0
+    # Recent samples only, so long runs use constant memory.
+    durations: deque = field(default_factory=lambda: deque(maxlen=10_000))
+    batch_sizes: deque = field(default_factory=lambda: deque(maxlen=10_000))
+
+
+def _distribution(values: deque, scale: float = 1.0) -> dict[str, float]:
+    array = np.asarray(values, dtype=np.float64) * scale
+    p50, p95, p99 = np.percentile(array, [50, 95, 99])
+
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(array.max()), 3),
+    }
+
+
+class MetricsRegistry:
+    """
+    Process-wide timers and counters.
+
+    Timers record per-call wall time and, optionally, the number of items
+    (batch size) and tokens processed, so a snapshot can report throughput,
+    latency percentiles and batch-size distributions per stage. Everything is
+    in-memory and thread-safe; metrics recorded in worker processes are not
+    collected.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._timings: dict[str, _Timing] = {}
+        self._counters: Counter[str] = Counter()
+        self._started_at = time.perf_counter()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self._started_at = time.perf_counter()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        items: int | None = None,
+        tokens: int | None = None,
+        error: bool = False,
+    ) -> None:
+        with self._lock:
+            timing = self._timings.setdefault(name, _Timing())
+            timing.calls += 1
+            timing.errors += error
+            timing.total_seconds += seconds
+            timing.durations.append(seconds)
+            if items is not None:
+                timing.items += items
+                timing.batch_sizes.append(items)
+            if tokens is not None:
+                timing.tokens += tokens
+
+    @contextmanager
+    def timer(
+        self, name: str, items: int | None = None, tokens: int | None = None
+    ) -> Iterator[Span]:
+        span = Span(items=items, tokens=tokens)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            self.record(
+                name, time.perf_counter() - start, span.items, span.tokens, error=True
+            )
+            raise
+        self.record(name, time.perf_counter() - start, span.items, span.tokens)
+
+    def timed(
+        self, name: str | None = None, items: Callable[[Any], int] | None = None
+    ) -> Callable[[F], F]:
+        """
+        Decorator version of `timer()`, for sync and async functions. `items`
+        computes the number of processed items from the return value.
+        """
+
+        def decorator(func: F) -> F:
+            timer_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(timer_name) as span:
+                        result = await func(*args, **kwargs)
+                        if items is not None:
+                            span.items = items(result)
+
+                    return result
+
+                return async_wrapper  # type: ignore[return-value]
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(timer_name) as span:
+                    result = func(*args, **kwargs)
+                    if items is not None:
+                        span.items = items(result)
+
+                return result
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            timings = {
+                name: self._summarize(timing)
+                for name, timing in sorted(self._timings.items())
+            }
+
+            return {
+                "wall_seconds": round(time.perf_counter() - self._started_at, 3),
+                "timings": timings,
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    @staticmethod
+    def _summarize(timing: _Timing) -> dict[str, Any]:
+        seconds = max(timing.total_seconds, 1e-9)
+        summary: dict[str, Any] = {
+            "calls": timing.calls,
+            "errors": timing.errors,
+            "total_seconds": round(timing.total_seconds, 3),
+            "latency_ms": _distribution(timing.durations, scale=1000),
+        }
+        if timing.batch_sizes:
+            summary["items"] = timing.items
+            summary["items_per_second"] = round(timing.items / seconds, 2)
+            summary["batch_size"] = _distribution(timing.batch_sizes)
+        if timing.tokens:
+            summary["tokens"] = timing.tokens
+            summary["tokens_per_second"] = round(timing.tokens / seconds, 2)
+
+        return summary
+
+    def dump(self, path: str | Path, **context: Any) -> dict[str, Any]:
+        """Append a snapshot, tagged with `context`, to a JSON lines file."""
+
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            **context,
+            **self.snapshot(),
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as f:
+            f.write(json.dumps(record) + "\n")
+
+        return record
+
+
+# Global registry
+metrics = MetricsRegistry()
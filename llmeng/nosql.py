@@ -1,10 +1,12 @@
 from contextlib import contextmanager
 import sqlite3
+from threading import Lock
 
 
 class DatabaseConnectionManager:
     _instance = None
     _initialized = False
+    _init_lock = Lock()
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -12,16 +14,15 @@ class DatabaseConnectionManager:
         return cls._instance
 
     def __init__(self, database_path: str = "llmeng.db"):
+        # The database is only created and migrated on first use, see
+        # `get_connection()`.
         if not self._initialized and database_path:
             self.database_path = database_path
-            self.initialize()
 
     @contextmanager
     def get_connection(self):
         if not self._initialized:
-            raise RuntimeError(
-                "DatabaseConnectionManager not initialized. Call initialize() first."
-            )
+            self.initialize()
 
         conn = sqlite3.connect(self.database_path)
         # Enable JSON1 extension features
@@ -33,26 +34,127 @@ class DatabaseConnectionManager:
 
     def initialize(self):
         """Initialize the database with required tables."""
-        DatabaseConnectionManager._initialized = True
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+        with self._init_lock:
+            if DatabaseConnectionManager._initialized:
+                return
+
+            conn = sqlite3.connect(self.database_path)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS documents (
+                        _id TEXT PRIMARY KEY,
+                        collection TEXT NOT NULL,
+                        data JSON NOT NULL
+                    )
+                """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_collection 
+                    ON documents(collection)
+                """
+                )
+                # MinHash signatures and LSH buckets of the chunks kept by the
+                # near-duplicate filter, see `llmeng.app.preprocessing.deduplication`.
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS chunk_signatures (
+                        chunk_id TEXT PRIMARY KEY,
+                        document_id TEXT NOT NULL,
+                        category TEXT NOT NULL,
+                        author_id TEXT NOT NULL,
+                        signature BLOB NOT NULL
+                    )
+                """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_chunk_signatures_document
+                    ON chunk_signatures(document_id)
                 """
-                CREATE TABLE IF NOT EXISTS documents (
-                    _id TEXT PRIMARY KEY,
-                    collection TEXT NOT NULL,
-                    data JSON NOT NULL
                 )
-            """
-            )
-            cursor.execute(
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS chunk_lsh_buckets (
+                        document_id TEXT NOT NULL,
+                        category TEXT NOT NULL,
+                        author_id TEXT NOT NULL,
+                        band INTEGER NOT NULL,
+                        bucket INTEGER NOT NULL,
+                        chunk_id TEXT NOT NULL
+                    )
                 """
-                CREATE INDEX IF NOT EXISTS idx_collection 
-                ON documents(collection)
-            """
-            )
-            conn.commit()
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_chunk_lsh_buckets
+                    ON chunk_lsh_buckets(category, author_id, band, bucket)
+                """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_chunk_lsh_buckets_document
+                    ON chunk_lsh_buckets(document_id)
+                """
+                )
+                # Per-document progress of resumable feature-engineering runs,
+                # see `llmeng.app.preprocessing.checkpoints`.
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS feature_checkpoints (
+                        stage TEXT NOT NULL,
+                        document_id TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        batch_uri TEXT,
+                        PRIMARY KEY (stage, document_id)
+                    )
+                """
+                )
+                # URL -> raw page body and HTTP validators of the crawlers'
+                # fetch cache, see `llmeng.app.crawlers.fetch_cache`.
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS fetch_cache (
+                        url TEXT PRIMARY KEY,
+                        content_hash TEXT NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        fetched_at REAL NOT NULL
+                    )
+                """
+                )
+                # Links waiting to be crawled, with their retry and lease
+                # state, see `llmeng.app.crawlers.frontier`.
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS crawl_frontier (
+                        link TEXT PRIMARY KEY,
+                        user_full_name TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        priority INTEGER NOT NULL DEFAULT 0,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL,
+                        lease_owner TEXT,
+                        lease_expires_at REAL,
+                        last_error TEXT,
+                        updated_at REAL NOT NULL
+                    )
+                """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_crawl_frontier_due
+                    ON crawl_frontier(status, priority, next_attempt_at)
+                """
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+            DatabaseConnectionManager._initialized = True
 
 
-# Global connection manager instance
+# Global connection manager instance (lazy: no database I/O until first use)
 db = DatabaseConnectionManager()
@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     TEXT_EMBEDDING_MODEL_ID: str = "sentence-transformers/all-MiniLM-L6-v2"
     RERANKING_CROSS_ENCODER_MODEL_ID: str = "cross-encoder/ms-marco-MINILM-L-4-v2"
     RAG_MODEL_DEVICE: str = "cuda"
+    # Embedded batches of resumable feature-engineering runs
+    FEATURE_CHECKPOINT_DIR: str = "data/checkpoints"
 
     # QdrantDB
     USE_QDRANT_CLOUD: bool = False
@@ -21,6 +23,23 @@ class Settings(BaseSettings):
     QDRANT_CLOUD_URL: str = "str"
     QDRANT_APIKEY: str | None = None
 
+    # Playwright crawlers: contexts leased at once from the shared browser, and
+    # pages served before the browser is relaunched
+    BROWSER_POOL_SIZE: int = 4
+    BROWSER_RECYCLE_AFTER_PAGES: int = 50
+
+    # HTTP client of the non-browser crawlers
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_MAX_CONNECTIONS: int = 32
+    HTTP_RETRIES: int = 3
+    # Raw pages fetched by the crawlers. FETCH_CACHE_MODE is one of
+    # "revalidate" (conditional requests), "prefer_cache" or "offline".
+    FETCH_CACHE_DIR: str = "data/fetch_cache"
+    FETCH_CACHE_MODE: str = "revalidate"
+
+    # Instrumentation: append per-step metrics snapshots to this JSON lines file
+    METRICS_FILE: str | None = None
+
     # Other
     DATASET_GENERATION_MODEL: str = "openrouter/openai/gpt-4o-mini"
     OPENROUTER_API_KEY: str | None = None
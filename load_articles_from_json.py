@@ -9,10 +9,9 @@ from litellm.types.utils import ModelResponse
 from rich.console import Console
 from rich.progress import track
 
+from llmeng.app.preprocessing.operations import iter_article_chunks
 from llmeng.settings import settings
 
-SENTENCE_PATTERN = re.compile(r"(?>!\w\.\w.)(?<![A-Za-z]\.)(?<=\.|\?|\!)\s")
-
 console = Console()
 
 
@@ -45,23 +44,7 @@ def extract_substring(
 
     for article in dataset["content"]:
         cleaned_article = clean_text(article)
-        sentences = SENTENCE_PATTERN.split(cleaned_article)
-
-        curr_chunk = ""
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-
-            if len(curr_chunk) + len(sentence) <= max_len:
-                curr_chunk += sentence + " "
-            else:
-                if len(curr_chunk) >= min_len:
-                    extracts.append(curr_chunk.strip())
-                curr_chunk = sentence + " "
-
-        if len(curr_chunk) >= min_len:
-            extracts.append(curr_chunk.strip())
+        extracts.extend(iter_article_chunks(cleaned_article, min_len, max_len))
 
     return extracts
 
@@ -4,8 +4,26 @@ from steps.etl import crawl_links, get_or_create_user
 
 
 @pipeline
-def digital_data_etl(user_full_name: str, links: list[str]) -> str:
+def digital_data_etl(
+    user_full_name: str,
+    links: list[str],
+    max_concurrency: int = 16,
+    per_domain_concurrency: int = 8,
+    requests_per_second: float | None = 8.0,
+    timeout: float | None = 180.0,
+    refresh_repositories: bool = False,
+    reparse_articles: bool = False,
+) -> str:
     user = get_or_create_user(user_full_name)
-    last_step = crawl_links(user=user, links=links)
+    last_step = crawl_links(
+        user=user,
+        links=links,
+        max_concurrency=max_concurrency,
+        per_domain_concurrency=per_domain_concurrency,
+        requests_per_second=requests_per_second,
+        timeout=timeout,
+        refresh_repositories=refresh_repositories,
+        reparse_articles=reparse_articles,
+    )
 
     return last_step.invocation_id
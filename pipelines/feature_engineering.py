@@ -4,13 +4,43 @@ from steps import feature_engineering as fe_steps
 
 
 @pipeline
-def feature_engineering(author_full_names: list[str]) -> None:
+def feature_engineering(
+    author_full_names: list[str],
+    num_workers: int = 1,
+    worker_batch_size: int = 16,
+    dedup_threshold: float | None = None,
+    embedding_batch_size: int = 64,
+    streaming: bool = False,
+    queue_size: int = 4,
+    resume: bool = False,
+) -> None:
+    if streaming:
+        # Documents flow through all stages in one step; only a summary is stored.
+        fe_steps.stream_feature_engineering(
+            author_full_names,
+            document_batch_size=worker_batch_size,
+            queue_size=queue_size,
+            dedup_threshold=dedup_threshold,
+            embedding_batch_size=embedding_batch_size,
+        )
+
+        return
+
     raw_documents = fe_steps.query_data_warehouse(author_full_names)
 
-    cleaned_documents = fe_steps.clean_documents(raw_documents)
-    fe_steps.load_to_vector_db(cleaned_documents)
+    cleaned_documents = fe_steps.clean_documents(
+        raw_documents, num_workers=num_workers, worker_batch_size=worker_batch_size
+    )
+    fe_steps.load_to_vector_db(cleaned_documents, resume=resume)
 
-    embedded_documents = fe_steps.chunk_and_embed(cleaned_documents)
-    fe_steps.load_to_vector_db(embedded_documents)
+    embedded_documents = fe_steps.chunk_and_embed(
+        cleaned_documents,
+        num_workers=num_workers,
+        worker_batch_size=worker_batch_size,
+        dedup_threshold=dedup_threshold,
+        embedding_batch_size=embedding_batch_size,
+        resume=resume,
+    )
+    fe_steps.load_to_vector_db(embedded_documents, resume=resume)
 
     # return [last_step_1.invocation_id, last_step_2.invocation_id]
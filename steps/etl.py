@@ -1,5 +1,4 @@
 import asyncio
-from urllib.parse import urlparse
 from typing_extensions import Annotated
 
 from loguru import logger
@@ -7,8 +6,11 @@ from tqdm import tqdm
 from zenml import get_step_context, step
 
 from llmeng.app.crawlers.dispatcher import CrawlerDispatcher
+from llmeng.app.crawlers.scheduler import CrawlScheduler
 from llmeng.domain.documents import UserDocument
+from llmeng.metrics import metrics
 from llmeng.utils import split_user_full_name
+from steps.instrumentation import add_metrics_metadata
 
 
 @step
@@ -38,7 +40,14 @@ def _get_metadata(user_full_name: str, user: UserDocument) -> dict:
 
 @step
 def crawl_links(
-    user: UserDocument, links: list[str]
+    user: UserDocument,
+    links: list[str],
+    max_concurrency: int = 16,
+    per_domain_concurrency: int = 8,
+    requests_per_second: float | None = 8.0,
+    timeout: float | None = 180.0,
+    refresh_repositories: bool = False,
+    reparse_articles: bool = False,
 ) -> Annotated[list[str], "crawled_links"]:
     dispatcher = (
         CrawlerDispatcher.build()
@@ -46,36 +55,38 @@ def crawl_links(
         .register_medium()
         .register_github()
     )
+    scheduler = CrawlScheduler(
+        dispatcher,
+        max_concurrency=max_concurrency,
+        per_domain_concurrency=per_domain_concurrency,
+        requests_per_second=requests_per_second,
+        timeout=timeout,
+    )
     logger.info(f"Starting to crawl {len(links)} link(s)")
-    metadata = {}
-    successful_crawls = 0
-    for link in tqdm(links):
-        successful_crawl, crawled_domain = asyncio.run(
-            _crawl_link(dispatcher, link, user)
+    metrics.reset()
+    with tqdm(total=len(links)) as progress:
+        results = asyncio.run(
+            scheduler.crawl(
+                links,
+                on_result=lambda _: progress.update(),
+                user=user,
+                refresh=refresh_repositories,
+                reparse=reparse_articles,
+            )
         )
-        successful_crawls += 1
-        metadata = _add_to_metadata(metadata, crawled_domain, successful_crawl)
+
+    metadata = {}
+    for result in results:
+        metadata = _add_to_metadata(metadata, result.domain, result.successful)
+    successful_crawls = sum(result.successful for result in results)
 
     step_context = get_step_context()
     step_context.add_output_metadata(output_name="crawled_links", metadata=metadata)
+    add_metrics_metadata("crawled_links")
     logger.info(f"Successfully crawled {successful_crawls} / {len(links)}")
     return links
 
 
-async def _crawl_link(
-    dispatcher: CrawlerDispatcher, link: str, user: UserDocument
-) -> tuple[bool, str]:
-    crawler = dispatcher.get_crawler(link)
-    crawler_domain = urlparse(link).netloc
-
-    try:
-        await crawler.extract(link=link, user=user)
-        return True, crawler_domain
-    except Exception as e:
-        logger.error(f"Failed to crawl: {e!s}")
-        return False, crawler_domain
-
-
 def _add_to_metadata(metadata: dict, domain: str, successful_crawl: bool) -> dict:
     if domain not in metadata:
         metadata[domain] = {}
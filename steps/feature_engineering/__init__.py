@@ -2,10 +2,12 @@ from .clean import clean_documents
 from .load_to_vector_db import load_to_vector_db
 from .query_data_warehouse import query_data_warehouse
 from .rag import chunk_and_embed
+from .stream import stream_feature_engineering
 
 __all__ = [
     "clean_documents",
     "load_to_vector_db",
     "query_data_warehouse",
     "chunk_and_embed",
+    "stream_feature_engineering",
 ]
@@ -1,8 +1,13 @@
 from typing import Annotated, Any
 from zenml import get_step_context, step
 
+from llmeng import utils
 from llmeng.app.preprocessing.dispatchers import CleaningDispatcher
+from llmeng.app.preprocessing.parallel import parallel_map
 from llmeng.domain.cleaned_documents import CleanedDocument
+from llmeng.metrics import metrics
+from steps.instrumentation import add_metrics_metadata
+from steps.materializers import DocumentListMaterializer
 
 
 def _get_metadata(cleaned_documents: list[CleanedDocument]) -> dict:
@@ -26,16 +31,25 @@ def _get_metadata(cleaned_documents: list[CleanedDocument]) -> dict:
     return metadata
 
 
-@step
+@step(output_materializers=DocumentListMaterializer)
 def clean_documents(
     docs: Annotated[list, "raw_documents"],
+    num_workers: int = 1,
+    worker_batch_size: int = 16,
 ) -> Annotated[list, "clean_documents"]:
-    cleaned_documents = []
-    for doc in docs:
-        cleaned_doc = CleaningDispatcher.dispatch(doc)
-        cleaned_documents.append(cleaned_doc)
+    metrics.reset()
+    # Each work unit is a list of documents, cleaned with a single dispatch_many().
+    cleaned_documents = utils.flatten(
+        parallel_map(
+            CleaningDispatcher.dispatch_many,
+            list(utils.batch(docs, worker_batch_size)),
+            num_workers=num_workers,
+            chunk_size=1,
+        )
+    )
     step_context = get_step_context()
     step_context.add_output_metadata(
         output_name="clean_documents", metadata=_get_metadata(cleaned_documents)
     )
+    add_metrics_metadata("clean_documents")
     return cleaned_documents
@@ -3,18 +3,110 @@ from typing import Annotated
 from zenml import step
 
 from llmeng import utils
+from llmeng.app.preprocessing.checkpoints import (
+    CheckpointStore,
+    content_hash,
+    group_by_document,
+    iter_document_batches,
+)
 from llmeng.domain.base.vector import VectorBaseDocument
+from llmeng.metrics import metrics
+from steps.instrumentation import add_metrics_metadata
+
+
+def delete_stale_chunks(
+    doc_class: type[VectorBaseDocument], chunk_ids: dict[str, list[str]]
+) -> bool:
+    """
+    Delete the chunks of the documents of `chunk_ids` (document ID -> IDs of
+    its current chunks) left over from previous versions of the documents, e.g.
+    files changed or removed by a repository refresh. Chunk IDs are content
+    hashes, so upserting the current chunks alone would leave them behind.
+    """
+
+    # Only chunks point back to their source document.
+    if "document_id" not in doc_class.model_fields:
+        return True
+
+    for keys in utils.batch(list(chunk_ids), 64):
+        try:
+            doc_class.delete_stale(
+                keys, keep_ids=utils.flatten([chunk_ids[key] for key in keys])
+            )
+        except Exception as error:
+            logger.error(
+                f"Failed to delete stale docs from {doc_class.get_collection_name()}: {error}",
+            )
+            return False
+
+    return True
+
+
+def _load_with_checkpoints(
+    doc_class: type[VectorBaseDocument], docs: list[VectorBaseDocument]
+) -> bool:
+    """
+    Skip documents already loaded, and checkpoint each loaded batch. Stale
+    chunks are deleted for the documents whose content changed since they were
+    loaded.
+    """
+
+    store = CheckpointStore(f"loaded:{doc_class.get_collection_name()}")
+    grouped = group_by_document(docs)
+    hashes = {key: content_hash(items) for key, items in grouped.items()}
+    completed = store.completed(hashes)
+    if completed:
+        logger.info(f"Resuming: {len(completed)} documents already loaded")
+        grouped = {key: items for key, items in grouped.items() if key not in completed}
+    previous = store.hashes(list(grouped))
+
+    for keys in iter_document_batches(grouped, min_size=4):
+        docs_batch = utils.flatten([grouped[key] for key in keys])
+        try:
+            successful = doc_class.bulk_insert(docs_batch)
+        except Exception as error:
+            logger.error(
+                f"Failed to insert docs into {doc_class.get_collection_name()}: {error}",
+            )
+            return False
+        if not successful:
+            return False
+
+        changed = {
+            key: [str(doc.id) for doc in grouped[key]]
+            for key in keys
+            if previous.get(key, hashes[key]) != hashes[key]
+        }
+        if not delete_stale_chunks(doc_class, changed):
+            return False
+        store.commit({key: hashes[key] for key in keys})
+
+    return True
 
 
 @step
 def load_to_vector_db(
     documents: Annotated[list, "documents"],
+    resume: bool = False,
 ) -> Annotated[bool, "successful"]:
+    metrics.reset()
+    successful = _load_to_vector_db(documents, resume)
+    add_metrics_metadata("successful")
+
+    return successful
+
+
+def _load_to_vector_db(documents: list, resume: bool) -> bool:
     logger.info(f"Loading {len(documents)} documents into the vector db")
 
     grouped_documents = VectorBaseDocument.group_by_class(documents)
     for doc_class, docs in grouped_documents.items():
         logger.info(f"Loading documents into {doc_class.get_collection_name()}")
+        if resume:
+            if not _load_with_checkpoints(doc_class, docs):
+                return False
+            continue
+
         for docs_batch in utils.batch(docs, size=4):
             try:
                 doc_class.bulk_insert(docs_batch)
@@ -23,4 +115,12 @@ def load_to_vector_db(
                     f"Failed to insert docs into {doc_class.get_collection_name()}: {error}",
                 )
                 return False
+
+        # Without checkpoints, any loaded document may have changed.
+        chunk_ids = {
+            key: [str(doc.id) for doc in items]
+            for key, items in group_by_document(docs).items()
+        }
+        if not delete_stale_chunks(doc_class, chunk_ids):
+            return False
     return True
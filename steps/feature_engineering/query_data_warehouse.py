@@ -12,7 +12,10 @@ from llmeng.domain.documents import (
     RepositoryDocument,
     UserDocument,
 )
+from llmeng.metrics import metrics
 from llmeng.utils import split_user_full_name
+from steps.instrumentation import add_metrics_metadata
+from steps.materializers import DocumentListMaterializer
 
 
 def _get_metadata(docs: list[Document]) -> dict:
@@ -69,10 +72,11 @@ def fetch_all_data(user: UserDocument) -> dict[str, list[NoSQLBaseDocument]]:
     return results
 
 
-@step
+@step(output_materializers=DocumentListMaterializer)
 def query_data_warehouse(
     author_full_names: list[str],
 ) -> Annotated[list, "raw_documents"]:
+    metrics.reset()
     docs = []
     authors = []
     for author_full_name in author_full_names:
@@ -89,4 +93,5 @@ def query_data_warehouse(
     step_context.add_output_metadata(
         output_name="raw_documents", metadata=_get_metadata(docs)
     )
+    add_metrics_metadata("raw_documents")
     return docs
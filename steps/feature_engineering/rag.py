@@ -1,11 +1,26 @@
 from typing import Annotated, Any
+from loguru import logger
 from zenml import get_step_context, step
 
+from llmeng.app.preprocessing.checkpoints import (
+    BatchSpill,
+    CheckpointStore,
+    content_hash,
+    group_by_document,
+    iter_document_batches,
+    referenced_batch_uris,
+)
+from llmeng.app.preprocessing.deduplication import ChunkDeduplicator
 from llmeng.app.preprocessing.dispatchers import ChunkingDispatcher, EmbeddingDispatcher
+from llmeng.app.preprocessing.parallel import parallel_map, preload_tokenizer
 from llmeng.domain.chunks import Chunk
 from llmeng.domain.cleaned_documents import CleanedDocument
 from llmeng import utils
 from llmeng.domain.embedded_chunks import EmbeddedChunk
+from llmeng.metrics import metrics
+from llmeng.settings import settings
+from steps.instrumentation import add_metrics_metadata
+from steps.materializers import DocumentListMaterializer
 
 
 def _add_chunks_metadata(chunks: list[Chunk], metadata: dict) -> dict:
@@ -45,29 +60,164 @@ def _add_embeddings_metadata(
     return metadata
 
 
-@step
+def _embed_and_checkpoint(
+    documents: list[CleanedDocument],
+    chunks: list[Chunk],
+    embedding_batch_size: int,
+    store: CheckpointStore,
+    hashes: dict[str, str],
+    previous: dict[str, EmbeddedChunk] | None = None,
+) -> list[EmbeddedChunk]:
+    """
+    Embed the chunks in batches that never split a document, writing each
+    completed batch to disk before committing its documents' checkpoints.
+    Chunks found in `previous` (by ID, i.e. content) reuse that embedding.
+    """
+
+    previous = previous or {}
+
+    spill = BatchSpill(settings.FEATURE_CHECKPOINT_DIR)
+    grouped: dict[str, list] = {str(document.id): [] for document in documents}
+    grouped.update(group_by_document(chunks))
+
+    embedded_chunks = []
+    for keys in iter_document_batches(grouped, embedding_batch_size):
+        batch = utils.flatten([grouped[key] for key in keys])
+        embedded_batch = [
+            previous[str(chunk.id)] for chunk in batch if str(chunk.id) in previous
+        ]
+        to_embed = [chunk for chunk in batch if str(chunk.id) not in previous]
+        for batched_chunks in utils.batch(to_embed, embedding_batch_size):
+            embedded_batch.extend(EmbeddingDispatcher.dispatch_many(batched_chunks))
+        if len(embedded_batch) < len(batch):
+            # Not committed, so a resumed run embeds these documents again.
+            continue
+
+        batch_uri = spill.write(embedded_batch) if embedded_batch else None
+        store.commit({key: hashes[key] for key in keys}, batch_uri=batch_uri)
+        embedded_chunks.extend(embedded_batch)
+
+    return embedded_chunks
+
+
+def _previous_embeddings(
+    store: CheckpointStore, documents: list[CleanedDocument]
+) -> dict[str, EmbeddedChunk]:
+    """Embedded chunks of earlier versions of `documents`, by chunk ID."""
+
+    batch_uris = store.batch_uris([str(document.id) for document in documents])
+    if not batch_uris:
+        return {}
+
+    previous_chunks, _ = BatchSpill(settings.FEATURE_CHECKPOINT_DIR).read(
+        set(batch_uris.values()), set(batch_uris)
+    )
+
+    return {
+        str(chunk.id): chunk
+        for chunk in previous_chunks
+        # Vectors from another model aren't interchangeable.
+        if chunk.metadata.get("embedding_model_id") == settings.TEXT_EMBEDDING_MODEL_ID
+    }
+
+
+@step(output_materializers=DocumentListMaterializer)
 def chunk_and_embed(
     cleaned_documents: Annotated[list[CleanedDocument], "cleaned_documents"],
+    num_workers: int = 1,
+    worker_batch_size: int = 16,
+    dedup_threshold: float | None = None,
+    embedding_batch_size: int = 64,
+    resume: bool = False,
 ) -> Annotated[list, "embedded_docuements"]:
+    metrics.reset()
     metadata: dict[Any, Any] = dict(
         chunking={}, embedding={}, num_documents=len(cleaned_documents)
     )
-    embedded_chunks = []
-    for document in cleaned_documents:
-        chunks = ChunkingDispatcher.dispatch(document)
-        metadata["chunking"] = _add_chunks_metadata(chunks, metadata["chunking"])
-        for batched_chunks in utils.batch(chunks, 10):
-            batched_embedded_chunks = EmbeddingDispatcher.dispatch(batched_chunks)
+    # With `resume`, progress is checkpointed per document and the documents
+    # already embedded by a previous (interrupted) run are restored from disk.
+    restored_chunks = []
+    if resume:
+        store = CheckpointStore("embedded")
+        hashes = {
+            str(document.id): content_hash([document]) for document in cleaned_documents
+        }
+        completed = store.completed(hashes)
+        spilled = {key for key, batch_uri in completed.items() if batch_uri}
+        restored_chunks, missing = BatchSpill(settings.FEATURE_CHECKPOINT_DIR).read(
+            {completed[key] for key in spilled}, spilled
+        )
+        resumed = completed.keys() - missing
+        cleaned_documents = [
+            document
+            for document in cleaned_documents
+            if str(document.id) not in resumed
+        ]
+        metadata["num_resumed_documents"] = len(resumed)
+        logger.info(
+            f"Resuming: {len(resumed)} documents already embedded",
+            num_restored_chunks=len(restored_chunks),
+            num_remaining_documents=len(cleaned_documents),
+        )
+        # Documents that changed since they were embedded (e.g. a refreshed
+        # repository) only embed their new chunks.
+        previous_chunks = _previous_embeddings(store, cleaned_documents)
+        metadata["num_reusable_embeddings"] = len(previous_chunks)
+
+    # Chunking (tokenization) runs in worker processes, embedding stays here.
+    # Each work unit is a list of documents chunked with a single dispatch_many().
+    chunked_documents = parallel_map(
+        ChunkingDispatcher.dispatch_many,
+        list(utils.batch(cleaned_documents, worker_batch_size)),
+        num_workers=num_workers,
+        chunk_size=1,
+        initializer=preload_tokenizer,
+    )
+    deduplicator = (
+        ChunkDeduplicator(threshold=dedup_threshold) if dedup_threshold else None
+    )
+    chunks = []
+    for document_chunks in chunked_documents:
+        metadata["chunking"] = _add_chunks_metadata(
+            document_chunks, metadata["chunking"]
+        )
+        if deduplicator is not None:
+            document_chunks = deduplicator.filter(document_chunks)
+        chunks.extend(document_chunks)
+
+    # Embed in global batches across documents and categories, so short posts
+    # don't turn into tiny forward passes.
+    if resume:
+        embedded_chunks = restored_chunks + _embed_and_checkpoint(
+            cleaned_documents,
+            chunks,
+            embedding_batch_size,
+            store,
+            hashes,
+            previous=previous_chunks,
+        )
+        # Batches whose documents were all embedded again since are garbage.
+        metadata["num_pruned_batches"] = BatchSpill(
+            settings.FEATURE_CHECKPOINT_DIR
+        ).prune(referenced_batch_uris())
+    else:
+        embedded_chunks = []
+        for batched_chunks in utils.batch(chunks, embedding_batch_size):
+            batched_embedded_chunks = EmbeddingDispatcher.dispatch_many(batched_chunks)
             embedded_chunks.extend(batched_embedded_chunks)
     metadata["embedding"] = _add_embeddings_metadata(
         embedded_chunks, metadata["embedding"]
     )
-    metadata["num_chunks"] = len(embedded_chunks)
+    metadata["num_chunks"] = len(chunks)
     metadata["num_embedded_chunks"] = len(embedded_chunks)
+    metadata["embedding_batch_size"] = embedding_batch_size
+    if deduplicator is not None:
+        metadata["deduplication"] = deduplicator.stats
 
     step_context = get_step_context()
     step_context.add_output_metadata(
         output_name="embedded_docuements", metadata=metadata
     )
+    add_metrics_metadata("embedded_docuements")
 
     return embedded_chunks
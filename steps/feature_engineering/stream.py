@@ -0,0 +1,145 @@
+from collections import defaultdict
+from typing import Annotated, Any, Iterator
+
+from loguru import logger
+from zenml import get_step_context, step
+
+from llmeng.app.preprocessing.checkpoints import document_key
+from llmeng.app.preprocessing.deduplication import ChunkDeduplicator
+from llmeng.app.preprocessing.dispatchers import (
+    ChunkingDispatcher,
+    CleaningDispatcher,
+    EmbeddingDispatcher,
+)
+from llmeng.app.preprocessing.streaming import StreamingPipeline
+from llmeng.domain.base.vector import VectorBaseDocument
+from llmeng.domain.chunks import Chunk
+from llmeng.domain.documents import (
+    ArticleDocument,
+    Document,
+    PostDocument,
+    RepositoryDocument,
+    UserDocument,
+)
+from llmeng.metrics import metrics
+from llmeng.utils import split_user_full_name
+from steps.feature_engineering.load_to_vector_db import delete_stale_chunks
+from steps.instrumentation import add_metrics_metadata
+
+
+def _iter_raw_documents(
+    author_full_names: list[str], batch_size: int
+) -> Iterator[list[Document]]:
+    for author_full_name in author_full_names:
+        logger.info(f"Streaming data warehouse documents for {author_full_name}")
+        first_name, last_name = split_user_full_name(author_full_name)
+        user = UserDocument.get_or_create(first_name=first_name, last_name=last_name)
+        for document_class in (ArticleDocument, PostDocument, RepositoryDocument):
+            yield from document_class.iter_find(
+                batch_size=batch_size, author_id=str(user.id)
+            )
+
+
+@step
+def stream_feature_engineering(
+    author_full_names: list[str],
+    document_batch_size: int = 16,
+    queue_size: int = 4,
+    dedup_threshold: float | None = None,
+    embedding_batch_size: int = 64,
+) -> Annotated[dict, "feature_engineering_summary"]:
+    """
+    Run warehouse -> clean -> chunk -> embed -> load as concurrent stages
+    connected by bounded queues, instead of materializing every intermediate
+    list as an artifact. Only the run summary is returned.
+    """
+
+    metrics.reset()
+    counts: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    # Chunk IDs loaded per class and source document. A document's chunks can
+    # span batches, so stale chunks are only deleted once everything is loaded.
+    loaded_ids: dict[type, dict[str, list[str]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    deduplicator = (
+        ChunkDeduplicator(threshold=dedup_threshold) if dedup_threshold else None
+    )
+
+    def clean(batches: Iterator[list]) -> Iterator[list]:
+        for batch in batches:
+            cleaned_documents = CleaningDispatcher.dispatch_many(batch)
+            for document in cleaned_documents:
+                counts[document.get_category()]["num_documents"] += 1
+            yield cleaned_documents
+
+    def chunk(batches: Iterator[list]) -> Iterator[list]:
+        for cleaned_documents in batches:
+            # The cleaned documents are loaded too, like in the batch pipeline.
+            yield cleaned_documents
+
+            chunks = ChunkingDispatcher.dispatch_many(cleaned_documents)
+            for chunk_model in chunks:
+                counts[chunk_model.get_category()]["num_chunks"] += 1
+            if deduplicator is not None:
+                chunks = deduplicator.filter(chunks)
+            if chunks:
+                yield chunks
+
+    def embed(batches: Iterator[list]) -> Iterator[list]:
+        buffer: list[Chunk] = []
+        for batch in batches:
+            if not isinstance(batch[0], Chunk):
+                yield batch
+                continue
+
+            buffer.extend(batch)
+            while len(buffer) >= embedding_batch_size:
+                yield EmbeddingDispatcher.dispatch_many(buffer[:embedding_batch_size])
+                buffer = buffer[embedding_batch_size:]
+
+        if buffer:
+            yield EmbeddingDispatcher.dispatch_many(buffer)
+
+    def load(batches: Iterator[list]) -> Iterator[list]:
+        for batch in batches:
+            grouped_documents = VectorBaseDocument.group_by_class(batch)
+            for document_class, documents in grouped_documents.items():
+                collection_name = document_class.get_collection_name()
+                try:
+                    successful = document_class.bulk_insert(documents)
+                except Exception as error:
+                    logger.error(
+                        f"Failed to insert docs into {collection_name}: {error}"
+                    )
+                    successful = False
+
+                status = "num_loaded" if successful else "num_failed"
+                counts[collection_name][status] += len(documents)
+                if successful:
+                    for document in documents:
+                        key = document_key(document)
+                        loaded_ids[document_class][key].append(str(document.id))
+            yield batch
+
+    pipeline = StreamingPipeline(
+        [("clean", clean), ("chunk", chunk), ("embed", embed), ("load", load)],
+        queue_size=queue_size,
+    )
+    pipeline.run(_iter_raw_documents(author_full_names, document_batch_size))
+    for document_class, chunk_ids in loaded_ids.items():
+        delete_stale_chunks(document_class, chunk_ids)
+
+    summary: dict[str, Any] = {
+        "batches": dict(pipeline.items_out),
+        **{str(key): dict(value) for key, value in counts.items()},
+    }
+    if deduplicator is not None:
+        summary["deduplication"] = deduplicator.stats
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="feature_engineering_summary", metadata=summary
+    )
+    add_metrics_metadata("feature_engineering_summary")
+
+    return summary
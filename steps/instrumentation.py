@@ -0,0 +1,26 @@
+from zenml import get_step_context
+
+from llmeng.metrics import metrics
+from llmeng.settings import settings
+
+
+def add_metrics_metadata(output_name: str) -> dict:
+    """
+    Attach the timers and counters recorded since the step started (see
+    `metrics.reset()`) to the step output, and append them to the local
+    metrics file when `METRICS_FILE` is set.
+    """
+
+    step_context = get_step_context()
+    summary = metrics.snapshot()
+    step_context.add_output_metadata(
+        output_name=output_name, metadata={"metrics": summary}
+    )
+    if settings.METRICS_FILE:
+        metrics.dump(
+            settings.METRICS_FILE,
+            pipeline_run=step_context.pipeline_run.name,
+            step=step_context.step_name,
+        )
+
+    return summary
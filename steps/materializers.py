@@ -0,0 +1,106 @@
+from collections import Counter
+import os
+from typing import Any, ClassVar, Iterator, Type
+
+from loguru import logger
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+from zenml.enums import ArtifactType
+from zenml.materializers.base_materializer import BaseMaterializer
+from zenml.metadata.metadata_types import MetadataType
+
+from llmeng.infra.arrow import (
+    documents_to_table,
+    iter_batches_as_documents,
+    table_to_documents,
+)
+
+DEFAULT_FILENAME = "documents.parquet"
+
+
+class DocumentListMaterializer(BaseMaterializer):
+    """
+    Stores lists of pydantic documents (raw, cleaned, chunks, embedded chunks)
+    as a single Parquet table instead of a pickle: one column per field and
+    embeddings as a fixed-size float32 list column.
+
+    Use it explicitly with `@step(output_materializers=DocumentListMaterializer)`;
+    it isn't registered as the default for `list`. Local artifacts are memory
+    mapped on load, and `iter_batches()` decodes the table one row group at a
+    time.
+    """
+
+    ASSOCIATED_TYPES: ClassVar[tuple[Type[Any], ...]] = (list,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.DATA
+    SKIP_REGISTRATION: ClassVar[bool] = True
+
+    ROW_GROUP_SIZE: ClassVar[int] = 1024
+
+    @property
+    def _path(self) -> str:
+        return os.path.join(self.uri, DEFAULT_FILENAME)
+
+    def _local_path(self) -> str:
+        """A local copy of the table that can be memory mapped."""
+
+        if os.path.exists(self._path):
+            return self._path
+
+        with self.get_temporary_directory(delete_at_exit=False) as temp_dir:
+            local_path = os.path.join(temp_dir, DEFAULT_FILENAME)
+            self.artifact_store.copyfile(self._path, local_path, overwrite=True)
+
+        return local_path
+
+    def load(self, data_type: Type[Any]) -> list[BaseModel]:
+        table = pq.read_table(self._local_path(), memory_map=True)
+
+        return table_to_documents(table)
+
+    def iter_batches(
+        self, batch_size: int = ROW_GROUP_SIZE
+    ) -> Iterator[list[BaseModel]]:
+        parquet_file = pq.ParquetFile(self._local_path(), memory_map=True)
+
+        yield from iter_batches_as_documents(
+            parquet_file.iter_batches(batch_size=batch_size)
+        )
+
+    def save(self, data: list[BaseModel]) -> None:
+        table = documents_to_table(data)
+        # Embedding floats barely compress and never repeat, so only the other
+        # columns are compressed and dictionary encoded.
+        vector_columns = {
+            field.name
+            for field in table.schema
+            if pa.types.is_fixed_size_list(field.type) or pa.types.is_list(field.type)
+        }
+        with self.artifact_store.open(self._path, "wb") as f:
+            pq.write_table(
+                table,
+                f,
+                row_group_size=self.ROW_GROUP_SIZE,
+                compression={
+                    name: "none" if name in vector_columns else "zstd"
+                    for name in table.column_names
+                },
+                use_dictionary=[
+                    name for name in table.column_names if name not in vector_columns
+                ],
+            )
+
+        logger.info(
+            f"Saved {len(data)} documents as a columnar artifact",
+            num_columns=table.num_columns,
+            nbytes=table.nbytes,
+        )
+
+    def extract_metadata(self, data: list[BaseModel]) -> dict[str, MetadataType]:
+        num_documents_per_class = Counter(type(document).__name__ for document in data)
+
+        return {
+            "num_documents": len(data),
+            "num_documents_per_class": dict(num_documents_per_class),
+            "storage_format": "parquet",
+        }
@@ -0,0 +1,13 @@
+import pytest
+
+from llmeng.nosql import DatabaseConnectionManager, db
+
+
+@pytest.fixture
+def warehouse(tmp_path, monkeypatch):
+    """The global warehouse, pointed at an empty database for the test."""
+
+    monkeypatch.setattr(db, "database_path", str(tmp_path / "llmeng.db"))
+    monkeypatch.setattr(DatabaseConnectionManager, "_initialized", False)
+
+    return db
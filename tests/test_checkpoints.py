@@ -0,0 +1,44 @@
+from pathlib import Path
+import uuid
+
+from llmeng.app.preprocessing.checkpoints import (
+    BatchSpill,
+    CheckpointStore,
+    referenced_batch_uris,
+)
+from llmeng.domain.documents import ArticleDocument
+
+
+def _article() -> ArticleDocument:
+    return ArticleDocument(
+        content={"Content": "an article"},
+        platform="medium",
+        link="https://medium.com/article",
+        author_id=uuid.uuid4(),
+        author_full_name="Jane Doe",
+    )
+
+
+def _files(spill: BatchSpill) -> set[str]:
+    return {path.name for path in spill.directory.iterdir()}
+
+
+def test_prune_deletes_the_batches_no_checkpoint_points_to(warehouse, tmp_path):
+    spill = BatchSpill(tmp_path / "checkpoints")
+    store = CheckpointStore("embedded")
+    first, second = _article(), _article()
+    old_batch = spill.write([first, second])
+    store.commit({str(first.id): "v1", str(second.id): "v1"}, batch_uri=old_batch)
+    first_batch = spill.write([first])
+    store.commit({str(first.id): "v2"}, batch_uri=first_batch)
+    (spill.directory / "interrupted.tmp").touch()
+
+    # The old batch still holds the second document.
+    assert spill.prune(referenced_batch_uris()) == 1
+    assert _files(spill) == {Path(old_batch).name, Path(first_batch).name}
+
+    second_batch = spill.write([second])
+    store.commit({str(second.id): "v2"}, batch_uri=second_batch)
+
+    assert spill.prune(referenced_batch_uris()) == 1
+    assert _files(spill) == {Path(first_batch).name, Path(second_batch).name}
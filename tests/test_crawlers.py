@@ -0,0 +1,81 @@
+import asyncio
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from llmeng.app.crawlers.base import BasePlaywrightCrawler
+from llmeng.app.crawlers.github import GithubCrawler
+
+
+class FakePage:
+    """Grows by one screen for each of the first `num_loads` scrolls."""
+
+    def __init__(self, num_loads: int) -> None:
+        self.num_loads = num_loads
+        self.height = 1_000
+        self.num_scrolls = 0
+        self.listeners: dict[str, list] = {}
+
+    def on(self, event: str, callback) -> None:
+        self.listeners.setdefault(event, []).append(callback)
+
+    def remove_listener(self, event: str, callback) -> None:
+        self.listeners[event].remove(callback)
+
+    async def evaluate(self, expression: str):
+        if expression.startswith("window.scrollTo"):
+            self.num_scrolls += 1
+            if self.num_scrolls <= self.num_loads:
+                self.height += 1_000
+            return None
+
+        return self.height
+
+    async def wait_for_function(
+        self, expression, arg=None, polling="raf", timeout=None
+    ):
+        # Like Playwright: "raf" or an interval in milliseconds.
+        if isinstance(polling, str) and polling != "raf":
+            raise ValueError(f"Unknown polling option: {polling}")
+        if self.height > arg:
+            return True
+
+        await asyncio.sleep(timeout / 1000)
+        raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+
+
+class FakeCrawler(BasePlaywrightCrawler):
+    scroll_initial_wait = 0.01
+    scroll_timeout = 0.05
+
+    async def extract(self, link: str, **kwargs) -> None:
+        pass
+
+
+def _scroll(page: FakePage, scroll_limit: int = 10) -> None:
+    crawler = FakeCrawler(scroll_limit=scroll_limit)
+    crawler._page = page
+    asyncio.run(crawler.scroll_page())
+
+
+def test_scroll_page_stops_when_the_page_stops_growing():
+    page = FakePage(num_loads=3)
+    _scroll(page)
+
+    assert page.height == 4_000
+    # The last scroll found nothing new.
+    assert page.num_scrolls == 4
+    assert all(not callbacks for callbacks in page.listeners.values())
+
+
+def test_scroll_page_respects_the_scroll_limit():
+    page = FakePage(num_loads=100)
+    _scroll(page, scroll_limit=2)
+
+    assert page.num_scrolls == 3
+
+
+def test_read_file_keeps_spaces_and_normalizes_newlines(tmp_path):
+    path = tmp_path / "main.py"
+    path.write_bytes(b"def main():\r\n    return 1\r\n")
+
+    assert GithubCrawler()._read_file(str(path)) == "def main():\n    return 1\n"
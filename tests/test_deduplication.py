@@ -0,0 +1,50 @@
+import random
+import uuid
+
+from llmeng.app.preprocessing.deduplication import ChunkDeduplicator
+from llmeng.domain.chunks import ArticleChunk
+
+WORDS = [f"word{i}" for i in range(1_000)]
+
+
+def _text(seed: int, num_words: int = 300) -> str:
+    return " ".join(random.Random(seed).choices(WORDS, k=num_words))
+
+
+def _chunk(content: str, document_id: uuid.UUID, author_id: uuid.UUID) -> ArticleChunk:
+    return ArticleChunk(
+        content=content,
+        platform="medium",
+        link="https://medium.com/article",
+        document_id=document_id,
+        author_id=author_id,
+        author_full_name="Jane Doe",
+    )
+
+
+def test_drops_near_duplicates_of_other_documents(warehouse):
+    author_id = uuid.uuid4()
+    text = _text(0)
+    deduplicator = ChunkDeduplicator(threshold=0.9)
+
+    first = deduplicator.filter([_chunk(text, uuid.uuid4(), author_id)])
+    copy = deduplicator.filter([_chunk(text + " end", uuid.uuid4(), author_id)])
+    other_author = deduplicator.filter([_chunk(text, uuid.uuid4(), uuid.uuid4())])
+
+    assert len(first) == 1
+    assert copy == []
+    assert len(other_author) == 1
+
+
+def test_keeps_edited_chunks_of_a_reprocessed_document(warehouse):
+    author_id, document_id = uuid.uuid4(), uuid.uuid4()
+    words = _text(0).split()
+    deduplicator = ChunkDeduplicator(threshold=0.9)
+    deduplicator.filter([_chunk(" ".join(words), document_id, author_id)])
+
+    words[150] = "edited"
+    edited = deduplicator.filter([_chunk(" ".join(words), document_id, author_id)])
+
+    assert len(edited) == 1
+    # The edited version replaced the original one in the index.
+    assert deduplicator.filter([_chunk(" ".join(words), uuid.uuid4(), author_id)]) == []
@@ -0,0 +1,53 @@
+import uuid
+
+import numpy as np
+
+from llmeng.app.preprocessing import dispatchers
+from llmeng.app.preprocessing.dispatchers import EmbeddingDispatcher
+from llmeng.app.preprocessing.embedding_data_handlers import embedding_model
+from llmeng.domain.chunks import ArticleChunk, PostChunk
+from llmeng.metrics import metrics
+
+
+def _fake_embed_contents(data_models):
+    # Like the embedding model: a failure anywhere in the batch returns nothing.
+    if any("bad" in data_model.content for data_model in data_models):
+        return np.array([], dtype=np.float32)
+
+    return np.array(
+        [[float(len(data_model.content))] for data_model in data_models],
+        dtype=np.float32,
+    )
+
+
+def _chunks(contents: list[str]) -> list:
+    author_id = uuid.uuid4()
+    chunk_classes = [ArticleChunk, PostChunk]
+
+    return [
+        chunk_classes[i % 2](
+            content=content,
+            platform="medium",
+            link="https://medium.com/article",
+            document_id=uuid.uuid4(),
+            author_id=author_id,
+            author_full_name="Jane Doe",
+            metadata={},
+        )
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_failed_batch_falls_back_to_chunk_by_chunk(monkeypatch):
+    monkeypatch.setattr(dispatchers, "embed_contents", _fake_embed_contents)
+    # Cached properties read from the model config: set them, offline.
+    monkeypatch.setitem(embedding_model.__dict__, "embedding_size", 1)
+    monkeypatch.setitem(embedding_model.__dict__, "max_input_length", 256)
+    metrics.reset()
+    chunks = _chunks(["a", "bb", "bad", "dddd"])
+
+    embedded = EmbeddingDispatcher.dispatch_many(chunks)
+
+    assert [chunk.content for chunk in embedded] == ["a", "bb", "dddd"]
+    assert [chunk.embedding[0] for chunk in embedded] == [1.0, 2.0, 4.0]
+    assert metrics.snapshot()["counters"]["embedding.failed"] == 1
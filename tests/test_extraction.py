@@ -0,0 +1,70 @@
+from llmeng.app.crawlers.extraction import main_content, parse_html
+
+PARAGRAPH = (
+    "<p>This is a paragraph of the article, with enough words, commas and "
+    "clauses to count as real content for the extraction heuristics.</p>"
+)
+ARTICLE_TEXT = "paragraph of the article"
+
+
+def _page(body: str) -> str:
+    return f"<html><head><title>Title</title></head><body>{body}</body></html>"
+
+
+def _extract(body: str) -> str:
+    return main_content(parse_html(_page(body))).get_text(" ", strip=True)
+
+
+def test_keeps_article_inside_wrapper_named_like_boilerplate():
+    text = _extract(
+        '<div class="site-content has-sidebar">'
+        f"<article>{PARAGRAPH * 5}</article>"
+        '<aside class="sidebar"><p>Sidebar links, archives and other widgets.</p>'
+        "</aside></div>"
+    )
+
+    assert ARTICLE_TEXT in text
+    assert "Sidebar links" not in text
+
+
+def test_keeps_content_inside_share_enabled_wrapper():
+    text = _extract(
+        '<div class="post-share-enabled">'
+        f'<div class="entry">{PARAGRAPH * 5}</div></div>'
+        '<div class="share-buttons"><a href="#">Share on social networks</a></div>'
+    )
+
+    assert ARTICLE_TEXT in text
+    assert "Share on" not in text
+
+
+def test_keeps_wrapper_holding_most_of_the_text():
+    # The "sidebar" class token matches, but the element is the page content.
+    text = _extract(f'<div id="content" class="content sidebar">{PARAGRAPH * 5}</div>')
+
+    assert ARTICLE_TEXT in text
+
+
+def test_strips_boilerplate_around_the_content():
+    text = _extract(
+        '<nav><a href="/">Home</a><a href="/about">About</a></nav>'
+        f'<div class="post">{PARAGRAPH * 4}'
+        '<div class="related-posts"><p>Another article you may like, with a long '
+        "teaser text.</p></div></div>"
+        "<footer>Copyright</footer>"
+    )
+
+    assert ARTICLE_TEXT in text
+    assert "Home" not in text
+    assert "you may like" not in text
+    assert "Copyright" not in text
+
+
+def test_skips_articles_inside_boilerplate():
+    text = _extract(
+        f'<aside class="sidebar"><article>{PARAGRAPH.replace("the article", "a promo") * 4}'
+        f"</article></aside><main>{PARAGRAPH * 5}</main>"
+    )
+
+    assert ARTICLE_TEXT in text
+    assert "a promo" not in text
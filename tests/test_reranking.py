@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+
+from llmeng.app.networks.base import SingletonMeta
+from llmeng.app.networks.embeddings import CrossEncoderModelSingleton
+from llmeng.app.rag.reranking import Reranker
+from llmeng.domain.embedded_chunks import EmbeddedArticleChunk
+from llmeng.domain.queries import Query
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the length of its text and records the batches."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[tuple[str, str]]] = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.batches.append(list(pairs))
+
+        return [float(len(text)) for _, text in pairs]
+
+
+@pytest.fixture
+def cross_encoder(monkeypatch):
+    monkeypatch.delitem(
+        SingletonMeta._instances, CrossEncoderModelSingleton, raising=False
+    )
+    model = CrossEncoderModelSingleton(batch_size=2, cache_size=4)
+    model._loaded_model = FakeCrossEncoder()
+    yield model
+    SingletonMeta._instances.pop(CrossEncoderModelSingleton, None)
+
+
+def test_scores_are_in_input_order_after_length_sorted_batching(cross_encoder):
+    texts = ["ccc", "a", "eeeee", "bb", "dddd"]
+
+    scores = cross_encoder([("q", text) for text in texts])
+
+    assert scores == [3.0, 1.0, 5.0, 2.0, 4.0]
+    assert [[text for _, text in batch] for batch in cross_encoder._model.batches] == [
+        ["a", "bb"],
+        ["ccc", "dddd"],
+        ["eeeee"],
+    ]
+
+
+def test_scores_are_cached_least_recently_used_first(cross_encoder):
+    cross_encoder([("q", "a"), ("q", "bb"), ("q", "a")])
+    # The repeated pair was scored once.
+    assert cross_encoder._model.batches == [[("q", "a"), ("q", "bb")]]
+
+    cross_encoder([("q", "a"), ("q", "ccc"), ("q", "dddd"), ("q", "eeeee")])
+    # Only the new pairs were scored; "bb" was the least recently used one.
+    assert len(cross_encoder._model.batches) == 3
+    assert list(cross_encoder._scores_cache) == [
+        ("q", "a"),
+        ("q", "ccc"),
+        ("q", "dddd"),
+        ("q", "eeeee"),
+    ]
+
+
+def test_reranker_keeps_the_best_of_the_first_candidates(cross_encoder):
+    author_id = uuid.uuid4()
+    chunks = [
+        EmbeddedArticleChunk(
+            content=content,
+            embedding=None,
+            platform="medium",
+            link="https://medium.com/article",
+            document_id=uuid.uuid4(),
+            author_id=author_id,
+            author_full_name="Jane Doe",
+        )
+        for content in ["bb", "dddd", "a", "ccc", "eeeeeeee"]
+    ]
+
+    reranked = Reranker(max_candidates=4).generate(
+        Query.from_str("query"), chunks, keep_top_k=2
+    )
+
+    assert [chunk.content for chunk in reranked] == ["dddd", "ccc"]
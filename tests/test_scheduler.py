@@ -0,0 +1,52 @@
+import asyncio
+
+from llmeng.app.crawlers.base import BaseCrawler
+from llmeng.app.crawlers.scheduler import CrawlScheduler
+
+
+class FakeCrawler(BaseCrawler):
+    """Waits `lease_seconds` for a browser context, then `extract_seconds`."""
+
+    lease_seconds = 0.0
+    extract_seconds = 0.0
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.lease_seconds)
+        return self
+
+    async def extract(self, link: str, **kwargs) -> None:
+        await asyncio.sleep(self.extract_seconds)
+
+
+class FakeDispatcher:
+    def __init__(self, crawler: type[BaseCrawler]) -> None:
+        self.crawler = crawler
+
+    def get_crawler(self, url: str) -> BaseCrawler:
+        return self.crawler()
+
+
+def _crawl(crawler: type[BaseCrawler], links: list[str], **kwargs):
+    scheduler = CrawlScheduler(FakeDispatcher(crawler), **kwargs)
+
+    return asyncio.run(scheduler.crawl(links))
+
+
+def test_timeout_starts_once_the_browser_is_leased():
+    class SlowLease(FakeCrawler):
+        lease_seconds = 0.2
+        extract_seconds = 0.05
+
+    (result,) = _crawl(SlowLease, ["https://example.com/a"], timeout=0.1)
+
+    assert result.successful
+
+
+def test_timeout_cancels_slow_extractions():
+    class SlowExtract(FakeCrawler):
+        extract_seconds = 1.0
+
+    (result,) = _crawl(SlowExtract, ["https://example.com/a"], timeout=0.1)
+
+    assert not result.successful
+    assert result.seconds < 0.5
@@ -0,0 +1,58 @@
+import uuid
+
+from llmeng.app.preprocessing.deduplication import ChunkDeduplicator
+from llmeng.app.preprocessing.streaming import StreamingPipeline
+from llmeng.domain.chunks import ArticleChunk
+from llmeng.domain.documents import ArticleDocument
+
+
+def _article(author_id: uuid.UUID, i: int) -> ArticleDocument:
+    return ArticleDocument(
+        content={"Content": f"article number {i} about topic {i} " * 10},
+        platform="medium",
+        link=f"https://medium.com/article-{i}",
+        author_id=author_id,
+        author_full_name="Jane Doe",
+    )
+
+
+def _chunk(document: ArticleDocument) -> ArticleChunk:
+    return ArticleChunk(
+        content=document.content["Content"],
+        platform=document.platform,
+        link=document.link,
+        document_id=document.id,
+        author_id=document.author_id,
+        author_full_name=document.author_full_name,
+    )
+
+
+def test_iter_find_pages_through_all_documents(warehouse):
+    author_id = uuid.uuid4()
+    documents = [_article(author_id, i) for i in range(7)]
+    ArticleDocument.bulk_insert(documents)
+    ArticleDocument.bulk_insert([_article(uuid.uuid4(), 100)])
+
+    batches = list(ArticleDocument.iter_find(batch_size=3, author_id=author_id))
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert {document.id for batch in batches for document in batch} == {
+        document.id for document in documents
+    }
+
+
+def test_streaming_several_batches_with_deduplication(warehouse):
+    author_id = uuid.uuid4()
+    ArticleDocument.bulk_insert([_article(author_id, i) for i in range(10)])
+    deduplicator = ChunkDeduplicator(threshold=0.9)
+
+    def dedup(batches):
+        for documents in batches:
+            # Writes to the warehouse while the source is still reading it.
+            yield deduplicator.filter([_chunk(document) for document in documents])
+
+    pipeline = StreamingPipeline([("dedup", dedup)], queue_size=1)
+    pipeline.run(ArticleDocument.iter_find(batch_size=2, author_id=author_id))
+
+    assert pipeline.items_out["source"] == 5
+    assert deduplicator.stats["articles"]["num_kept"] == 10
@@ -0,0 +1,369 @@
+from datetime import datetime, timezone
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import typer
+from loguru import logger
+
+from llmeng.domain.types import DataCategory
+from llmeng.metrics import metrics
+from tools.synthetic_corpus import DEFAULT_MIX, CorpusGenerator
+
+app = typer.Typer()
+
+root_dir = Path(__file__).resolve().parent.parent
+
+BENCHMARKS = ["clean", "chunk", "embed", "nosql", "vector"]
+
+
+def _git_commit() -> str | None:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=root_dir,
+        capture_output=True,
+        text=True,
+    )
+
+    return result.stdout.strip() or None
+
+
+def _measure(name: str, func: Callable[[], Any], items: int, **extra: Any) -> dict:
+    """Run `func` once with fresh metrics and return its timings."""
+
+    metrics.reset()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    result = {
+        "benchmark": name,
+        "seconds": round(seconds, 4),
+        "items": items,
+        "items_per_second": round(items / seconds, 2) if seconds else None,
+        **extra,
+        # Timers recorded by the instrumented code paths during the run.
+        "metrics": metrics.snapshot()["timings"],
+    }
+    logger.info(
+        f"{name}: {seconds:.3f} s, {result['items_per_second']} items/s",
+        items=items,
+    )
+
+    return result
+
+
+def bench_clean(documents: list) -> tuple[list[dict], list]:
+    from llmeng.app.preprocessing.dispatchers import CleaningDispatcher
+    from llmeng.app.preprocessing.operations import clean_text
+
+    texts = [
+        " #### ".join(map(str, document.content.values())) for document in documents
+    ]
+    num_chars = sum(len(text) for text in texts)
+    result = _measure(
+        "clean_text", lambda: [clean_text(text) for text in texts], items=len(texts)
+    )
+    result["chars_per_second"] = round(num_chars / result["seconds"], 2)
+    results = [result]
+
+    cleaned_documents: list = []
+    results.append(
+        _measure(
+            "cleaning_dispatch_many",
+            lambda: cleaned_documents.extend(
+                CleaningDispatcher.dispatch_many(documents)
+            ),
+            items=len(documents),
+        )
+    )
+
+    return results, cleaned_documents
+
+
+def bench_chunk(cleaned_documents: list) -> tuple[list[dict], list]:
+    from llmeng.app.preprocessing.dispatchers import ChunkingDispatcher
+    from llmeng.app.preprocessing.operations import chunk_article, chunk_text
+
+    articles = [
+        document.content
+        for document in cleaned_documents
+        if document.get_category() == DataCategory.ARTICLES
+    ]
+    others = [
+        document.content
+        for document in cleaned_documents
+        if document.get_category() != DataCategory.ARTICLES
+    ]
+    results = [
+        _measure(
+            "chunk_article",
+            lambda: [
+                chunk_article(text, min_length=1_000, max_length=2_000)
+                for text in articles
+            ],
+            items=len(articles),
+        ),
+        _measure(
+            "chunk_text",
+            lambda: [
+                chunk_text(text, chunk_size=1_500, chunk_overlap=100) for text in others
+            ],
+            items=len(others),
+        ),
+    ]
+
+    chunks: list = []
+    results.append(
+        _measure(
+            "chunking_dispatch_many",
+            lambda: chunks.extend(ChunkingDispatcher.dispatch_many(cleaned_documents)),
+            items=len(cleaned_documents),
+        )
+    )
+    results[-1]["num_chunks"] = len(chunks)
+
+    return results, chunks
+
+
+def bench_embed(chunks: list, batch_size: int, limit: int) -> tuple[list[dict], list]:
+    from llmeng.app.preprocessing.dispatchers import EmbeddingDispatcher
+    from llmeng import utils
+
+    sample = chunks[:limit]
+    embedded_chunks: list = []
+
+    def embed() -> None:
+        for batch in utils.batch(sample, batch_size):
+            embedded_chunks.extend(EmbeddingDispatcher.dispatch_many(batch))
+
+    result = _measure("embed_batch", embed, items=len(sample), batch_size=batch_size)
+    if len(embedded_chunks) != len(sample):
+        raise RuntimeError("Embedding failed, see the logs above.")
+
+    return [result], embedded_chunks
+
+
+def bench_nosql(documents: list, database_path: Path, sample_size: int) -> list[dict]:
+    from llmeng.domain.documents import ArticleDocument
+    from llmeng.nosql import DatabaseConnectionManager, db
+
+    # One database per corpus size: its tables are created on first use, so
+    # the manager must forget it already initialized the previous one.
+    db.database_path = str(database_path)
+    DatabaseConnectionManager._initialized = False
+
+    sample = documents[:sample_size]
+    grouped: dict[type, list] = {}
+    for document in documents:
+        grouped.setdefault(type(document), []).append(document)
+
+    results = [
+        _measure("nosql_save", lambda: [d.save() for d in sample], items=len(sample)),
+        _measure(
+            "nosql_bulk_insert",
+            lambda: [
+                document_class.bulk_insert(docs)
+                for document_class, docs in grouped.items()
+            ],
+            items=len(documents),
+        ),
+        _measure(
+            "nosql_find",
+            lambda: [type(d).find(id=str(d.id)) for d in sample],
+            items=len(sample),
+        ),
+    ]
+    author_ids = sorted({str(document.author_id) for document in documents})
+    results.append(
+        _measure(
+            "nosql_bulk_find",
+            lambda: [ArticleDocument.bulk_find(author_id=a) for a in author_ids],
+            items=len(grouped.get(ArticleDocument, [])),
+        )
+    )
+
+    return results
+
+
+def bench_vector(
+    chunks: list, vector_size: int, num_queries: int, batch_size: int
+) -> list[dict]:
+    """
+    Upsert and search against Qdrant's in-process local mode. Chunks get random
+    unit vectors, so this runs without the embedding model.
+    """
+
+    from qdrant_client import QdrantClient
+    from qdrant_client.http.models import Distance, VectorParams
+
+    from llmeng import utils
+    from llmeng.domain.base.vector import VectorBaseDocument
+    from llmeng.domain.embedded_chunks import (
+        EmbeddedArticleChunk,
+        EmbeddedPostChunk,
+        EmbeddedRepositoryChunk,
+    )
+    from llmeng.infra.qdrant import QdrantDatabaseConnector
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((len(chunks), vector_size), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    embedded_classes = {
+        DataCategory.POSTS: EmbeddedPostChunk,
+        DataCategory.ARTICLES: EmbeddedArticleChunk,
+        DataCategory.REPOSITORIES: EmbeddedRepositoryChunk,
+    }
+    embedded_chunks = [
+        embedded_classes[chunk.get_category()](**dict(chunk), embedding=vector)
+        for chunk, vector in zip(chunks, vectors)
+    ]
+
+    # The connector is a lazily created singleton: swap in the local stand-in.
+    client = QdrantClient(location=":memory:")
+    QdrantDatabaseConnector._instance = client
+    grouped = VectorBaseDocument.group_by_class(embedded_chunks)
+    for document_class in grouped:
+        client.create_collection(
+            collection_name=document_class.get_collection_name(),
+            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+        )
+
+    def upsert() -> None:
+        for document_class, documents in grouped.items():
+            for batch in utils.batch(documents, batch_size):
+                document_class.bulk_insert(batch)
+
+    results = [_measure("vector_upsert", upsert, items=len(embedded_chunks))]
+
+    queries = vectors[rng.integers(0, len(vectors), size=num_queries)]
+    collection_names = [cls.get_collection_name() for cls in grouped]
+
+    def search() -> None:
+        for i, query in enumerate(queries):
+            with metrics.timer("vector.search"):
+                client.query_points(
+                    collection_name=collection_names[i % len(collection_names)],
+                    query=query.tolist(),
+                    limit=10,
+                )
+
+    results.append(_measure("vector_search", search, items=num_queries))
+
+    return results
+
+
+def _parse_mix(mix: str | None) -> dict[DataCategory, float]:
+    if not mix:
+        return DEFAULT_MIX
+
+    return {
+        DataCategory(category): float(share)
+        for category, share in (pair.split("=") for pair in mix.split(","))
+    }
+
+
+@app.command()
+def run(
+    sizes: list[int] = typer.Option(
+        [1_000, 10_000, 100_000, 1_000_000], "--size", help="Chunks in the corpus."
+    ),
+    benchmarks: list[str] = typer.Option(BENCHMARKS, "--benchmark"),
+    mix: str | None = typer.Option(
+        None, help="e.g. posts=0.2,articles=0.5,repositories=0.3"
+    ),
+    seed: int = 0,
+    embedding_batch_size: int = 64,
+    embedding_limit: int = 2_000,
+    nosql_sample_size: int = 1_000,
+    vector_size: int = 384,
+    num_queries: int = 200,
+    output: Path | None = None,
+):
+    """Run the benchmarks on synthetic corpora of each size and save the results."""
+
+    unknown = set(benchmarks) - set(BENCHMARKS)
+    if unknown:
+        raise typer.BadParameter(f"Unknown benchmarks: {sorted(unknown)}")
+
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            corpus = CorpusGenerator(seed=seed).corpus(size, mix=_parse_mix(mix))
+            logger.info(
+                f"Corpus of ~{corpus.expected_num_chunks} chunks",
+                num_documents=len(corpus.documents),
+                **corpus.by_category(),
+            )
+            size_results: list[dict] = []
+            cleaned_documents = chunks = None
+            if {"clean", "chunk", "embed", "vector"} & set(benchmarks):
+                results, cleaned_documents = bench_clean(corpus.documents)
+                if "clean" in benchmarks:
+                    size_results.extend(results)
+            if {"chunk", "embed", "vector"} & set(benchmarks):
+                results, chunks = bench_chunk(cleaned_documents)
+                if "chunk" in benchmarks:
+                    size_results.extend(results)
+            if "embed" in benchmarks:
+                results, _ = bench_embed(chunks, embedding_batch_size, embedding_limit)
+                size_results.extend(results)
+            if "nosql" in benchmarks:
+                size_results.extend(
+                    bench_nosql(
+                        corpus.documents,
+                        Path(temp_dir) / f"benchmark_{size}.db",
+                        nosql_sample_size,
+                    )
+                )
+            if "vector" in benchmarks:
+                size_results.extend(
+                    bench_vector(chunks, vector_size, num_queries, embedding_batch_size)
+                )
+
+            for result in size_results:
+                report["results"].append({"size": size, **result})
+
+    output = output or root_dir / "benchmarks" / f"{report['commit'] or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    logger.info(f"Results written to {output}")
+
+
+@app.command()
+def compare(baseline: Path, candidate: Path):
+    """Print the speedup of `candidate` over `baseline` per benchmark and size."""
+
+    def load(path: Path) -> dict[tuple[int, str], dict]:
+        report = json.loads(path.read_text())
+
+        return {
+            (result["size"], result["benchmark"]): result
+            for result in report["results"]
+            if "seconds" in result
+        }
+
+    baseline_results, candidate_results = load(baseline), load(candidate)
+    for key in sorted(baseline_results.keys() & candidate_results.keys()):
+        before = baseline_results[key]["seconds"]
+        after = candidate_results[key]["seconds"]
+        size, name = key
+        logger.info(
+            f"{name} @ {size}: {before:.3f} s -> {after:.3f} s ({before / after:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    app()
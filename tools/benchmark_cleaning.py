@@ -0,0 +1,93 @@
+import json
+import random
+import re
+import string
+import time
+from pathlib import Path
+
+import typer
+from loguru import logger
+
+from llmeng.app.preprocessing.operations.cleaning import clean_and_join, clean_text
+
+app = typer.Typer()
+
+
+def reference_clean_text(text: str) -> str:
+    """The original two-pass implementation, kept as the ground truth."""
+
+    text = re.sub(r"[^\w\s.,!?]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+
+    return text.strip()
+
+
+def make_repository_files(num_files: int, file_size: int, seed: int = 0) -> list[str]:
+    """Source-like files: code punctuation, indentation, blank lines, unicode."""
+
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "_"
+    symbols = list("()[]{}<>=+-*/%:;#'\"`@$^&|~\\") + ["->", "==", "    ", "\t"]
+    extras = ["\n", "\n\n", " ", ".", ",", "!", "?", "é", "ü", "—", "✓", " "]
+
+    files = []
+    for _ in range(num_files):
+        parts = []
+        size = 0
+        while size < file_size:
+            roll = rng.random()
+            if roll < 0.6:
+                part = "".join(rng.choices(alphabet, k=rng.randint(1, 12)))
+            elif roll < 0.85:
+                part = rng.choice(symbols)
+            else:
+                part = rng.choice(extras)
+            parts.append(part)
+            size += len(part)
+        files.append("".join(parts))
+
+    return files
+
+
+def check_equivalence(files: list[str]) -> None:
+    for text in files:
+        assert clean_text(text) == reference_clean_text(text)
+    assert clean_and_join(files) == reference_clean_text(" #### ".join(files))
+
+
+@app.command()
+def main(
+    num_files: int = 200,
+    file_size: int = 50_000,
+    repeat: int = 3,
+    output: Path | None = None,
+):
+    files = make_repository_files(num_files, file_size)
+    total_mb = sum(len(text) for text in files) / 1e6
+    check_equivalence(files)
+    logger.info(f"Outputs identical on {num_files} files ({total_mb:.1f} M chars)")
+
+    candidates = {
+        "reference": lambda: reference_clean_text(" #### ".join(files)),
+        "clean_text": lambda: clean_text(" #### ".join(files)),
+        "clean_and_join": lambda: clean_and_join(files),
+    }
+    results = {}
+    for name, func in candidates.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        results[name] = {"best_seconds": min(timings), "mchars": total_mb}
+        logger.info(
+            f"{name}: {min(timings):.3f} s ({total_mb / min(timings):.1f} M chars/s)"
+        )
+
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+        logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    app()
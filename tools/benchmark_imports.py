@@ -0,0 +1,88 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import typer
+from loguru import logger
+
+app = typer.Typer()
+
+root_dir = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = [
+    "llmeng.settings",
+    "llmeng.nosql",
+    "llmeng.infra.qdrant",
+    "llmeng.domain.base.vector",
+    "llmeng.app.networks.embeddings",
+    "llmeng.app.preprocessing.operations.chunking",
+    "llmeng.app.preprocessing.embedding_data_handlers",
+    "llmeng.app.preprocessing.dispatchers",
+    "llmeng.app.crawlers.dispatcher",
+    "tools.run",
+]
+
+# Modules that must never be pulled in just by importing the application.
+HEAVY_MODULES = ["torch", "sentence_transformers", "transformers"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_import(module: str) -> dict:
+    """Import `module` in a fresh interpreter and report its cold import time."""
+
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=root_dir,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"module": module, "error": result.stderr.strip().splitlines()[-1:]}
+
+    return {"module": module, **json.loads(result.stdout.strip().splitlines()[-1])}
+
+
+@app.command()
+def main(
+    modules: list[str] = typer.Argument(None),
+    repeat: int = 3,
+    output: Path | None = None,
+):
+    results = []
+    for module in modules or DEFAULT_MODULES:
+        runs = [measure_import(module) for _ in range(repeat)]
+        timings = [run["seconds"] for run in runs if "seconds" in run]
+        if not timings:
+            logger.error(f"Failed to import {module}: {runs[0]['error']}")
+            results.append(runs[0])
+            continue
+
+        entry = {
+            "module": module,
+            "best_seconds": min(timings),
+            "heavy_modules": runs[0]["heavy_modules"],
+        }
+        results.append(entry)
+        heavy = ", ".join(entry["heavy_modules"]) or "-"
+        logger.info(
+            f"{module}: {entry['best_seconds'] * 1000:.1f} ms (heavy imports: {heavy})"
+        )
+
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+        logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    app()
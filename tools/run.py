@@ -1,11 +1,13 @@
 from pathlib import Path
 from datetime import datetime as dt
+import os
+import socket
 
 import typer
 from loguru import logger
 
-from pipelines.digital_data_etl import digital_data_etl
-from pipelines.feature_engineering import feature_engineering
+# Pipelines are imported inside the commands: importing them pulls in ZenML and
+# the whole application, which `--help` should not pay for.
 
 app = typer.Typer()
 
@@ -14,6 +16,8 @@ root_dir = Path(__file__).resolve().parent.parent
 
 @app.command()
 def run_etl(etl_config_filename: str):
+    from pipelines.digital_data_etl import digital_data_etl
+
     logger.info("Running ETL")
     run_args_etl = {}
     config_path = str(root_dir / "configs" / etl_config_filename)
@@ -30,6 +34,8 @@ def run_feature_engineering(
     config_path: Path = root_dir / "configs" / "feature_engineering.yaml",
     run_name: str | None = None,
 ):
+    from pipelines.feature_engineering import feature_engineering
+
     run_args_fe = {}
     pipeline_args = {
         "enable_cache": not no_cache,
@@ -42,5 +48,76 @@ def run_feature_engineering(
     feature_engineering.with_options(**pipeline_args)(**run_args_fe)
 
 
+@app.command()
+def enqueue_links(etl_config_filename: str, priority: int = 0):
+    """Queue the links of an ETL config in the crawl frontier."""
+
+    import yaml
+
+    from llmeng.app.crawlers.frontier import CrawlFrontier
+
+    config_path = root_dir / "configs" / etl_config_filename
+    parameters = yaml.safe_load(config_path.read_text())["parameters"]
+    frontier = CrawlFrontier()
+    num_added = frontier.enqueue(
+        parameters["links"], parameters["user_full_name"], priority=priority
+    )
+    logger.info(f"Queued {num_added} new link(s)", **frontier.stats())
+
+
+@app.command()
+def drain_frontier(
+    workers: int = typer.Option(16, help="Links crawled at the same time."),
+    batch_size: int | None = typer.Option(
+        None, help="Links leased at once (default: 4 x workers)."
+    ),
+    per_domain_concurrency: int = 8,
+    requests_per_second: float = 8.0,
+    timeout: float = 180.0,
+    max_attempts: int = 5,
+    lease_seconds: float = typer.Option(
+        1800.0, help="Should exceed the time it takes to crawl a batch."
+    ),
+    refresh_repositories: bool = False,
+):
+    """
+    Crawl the due links of the crawl frontier until none are left. Several
+    drains can run at once, in any number of processes.
+    """
+
+    import asyncio
+
+    from llmeng.app.crawlers.dispatcher import CrawlerDispatcher
+    from llmeng.app.crawlers.frontier import CrawlFrontier
+    from llmeng.app.crawlers.scheduler import CrawlScheduler, drain_frontier
+
+    dispatcher = (
+        CrawlerDispatcher.build()
+        .register_linkedin()
+        .register_medium()
+        .register_github()
+    )
+    scheduler = CrawlScheduler(
+        dispatcher,
+        max_concurrency=workers,
+        per_domain_concurrency=per_domain_concurrency,
+        requests_per_second=requests_per_second,
+        timeout=timeout,
+    )
+    frontier = CrawlFrontier(max_attempts=max_attempts, lease_seconds=lease_seconds)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Draining the crawl frontier as {worker_id}", **frontier.stats())
+    counts = asyncio.run(
+        drain_frontier(
+            frontier,
+            scheduler,
+            worker_id,
+            batch_size=batch_size or 4 * workers,
+            refresh=refresh_repositories,
+        )
+    )
+    logger.info("Done", drained=counts, frontier=frontier.stats())
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+import random
+import string
+import uuid
+
+from llmeng.domain.documents import (
+    ArticleDocument,
+    Document,
+    PostDocument,
+    RepositoryDocument,
+)
+from llmeng.domain.types import DataCategory
+
+AUTHORS = ["Alex Vesa", "Maxime Labonne", "Paul Iusztin"]
+
+# Share of the chunks per category, roughly the mix of the warehouse.
+DEFAULT_MIX = {
+    DataCategory.POSTS: 0.15,
+    DataCategory.ARTICLES: 0.45,
+    DataCategory.REPOSITORIES: 0.40,
+}
+
+# Approximate characters per chunk, given the chunking handlers' settings.
+_CHARS_PER_CHUNK = {
+    DataCategory.POSTS: 1_000,
+    DataCategory.ARTICLES: 1_900,
+    DataCategory.REPOSITORIES: 700,
+}
+
+_CODE_SYMBOLS = ["()", "[]", "{}", "=", "==", "->", ":", ";", "#", "+", "*", "'", '"']
+
+
+@dataclass
+class Corpus:
+    documents: list[Document]
+    expected_num_chunks: int
+
+    def by_category(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for document in self.documents:
+            category = str(document.get_collection_name())
+            counts[category] = counts.get(category, 0) + 1
+
+        return counts
+
+
+class CorpusGenerator:
+    """
+    Deterministic synthetic documents shaped like the crawlers' output: LinkedIn
+    posts, Medium articles and GitHub repositories (whitespace stripped, as the
+    GitHub crawler does). The same seed always yields the same corpus.
+    """
+
+    def __init__(self, seed: int = 0, vocabulary_size: int = 5_000) -> None:
+        self._rng = random.Random(seed)
+        self._vocabulary = [
+            "".join(
+                self._rng.choices(string.ascii_lowercase, k=self._rng.randint(2, 10))
+            )
+            for _ in range(vocabulary_size)
+        ]
+        self._author_ids = {
+            name: uuid.UUID(int=self._rng.getrandbits(128), version=4)
+            for name in AUTHORS
+        }
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self._rng.getrandbits(128), version=4)
+
+    def _sentence(self) -> str:
+        words = self._rng.choices(self._vocabulary, k=self._rng.randint(6, 24))
+        sentence = " ".join(words).capitalize()
+        if self._rng.random() < 0.2:
+            sentence += ", " + " ".join(self._rng.choices(self._vocabulary, k=4))
+
+        return sentence + self._rng.choice([".", ".", ".", "?", "!"])
+
+    def _paragraph(self, num_chars: int) -> str:
+        sentences = []
+        size = 0
+        while size < num_chars:
+            sentence = self._sentence()
+            sentences.append(sentence)
+            size += len(sentence) + 1
+
+        return " ".join(sentences)
+
+    def _text(self, num_chars: int, paragraph_size: int = 600) -> str:
+        paragraphs = []
+        size = 0
+        while size < num_chars:
+            paragraph = self._paragraph(min(paragraph_size, num_chars - size))
+            paragraphs.append(paragraph)
+            size += len(paragraph) + 2
+
+        return "\n\n".join(paragraphs)
+
+    def _code(self, num_chars: int) -> str:
+        lines = []
+        size = 0
+        while size < num_chars:
+            tokens = [
+                (
+                    self._rng.choice(self._vocabulary)
+                    if self._rng.random() < 0.6
+                    else self._rng.choice(_CODE_SYMBOLS)
+                )
+                for _ in range(self._rng.randint(3, 12))
+            ]
+            line = "".join(tokens)
+            lines.append(line)
+            size += len(line) + 1
+
+        return "\n".join(lines)
+
+    def _common_fields(self) -> dict:
+        author = self._rng.choice(AUTHORS)
+
+        return {
+            "id": self._uuid(),
+            "author_id": self._author_ids[author],
+            "author_full_name": author,
+        }
+
+    def post(self, num_chunks: int = 1) -> PostDocument:
+        num_chars = num_chunks * _CHARS_PER_CHUNK[DataCategory.POSTS]
+
+        return PostDocument(
+            content={"text": self._text(num_chars, paragraph_size=200)},
+            platform="linkedin",
+            **self._common_fields(),
+        )
+
+    def article(self, num_chunks: int = 4) -> ArticleDocument:
+        num_chars = num_chunks * _CHARS_PER_CHUNK[DataCategory.ARTICLES]
+
+        return ArticleDocument(
+            content={
+                "Title": self._sentence(),
+                "Subtitle": self._sentence(),
+                "Content": self._text(num_chars),
+            },
+            link=f"https://medium.com/@synthetic/{self._uuid().hex}",
+            platform="medium",
+            **self._common_fields(),
+        )
+
+    def repository(self, num_chunks: int = 40) -> RepositoryDocument:
+        num_chars = num_chunks * _CHARS_PER_CHUNK[DataCategory.REPOSITORIES]
+        num_files = max(1, num_chars // 4_000)
+        name = "-".join(self._rng.choices(self._vocabulary, k=2))
+
+        return RepositoryDocument(
+            content={
+                f"src/{self._rng.choice(self._vocabulary)}_{i}.py": self._code(
+                    num_chars // num_files
+                )
+                for i in range(num_files)
+            },
+            name=name,
+            link=f"https://github.com/synthetic/{name}",
+            platform="github",
+            **self._common_fields(),
+        )
+
+    def corpus(
+        self, num_chunks: int, mix: dict[DataCategory, float] | None = None
+    ) -> Corpus:
+        """
+        Documents that chunk into about `num_chunks` chunks, split between the
+        categories according to `mix` (share of chunks per category).
+        """
+
+        mix = mix or DEFAULT_MIX
+        total_share = sum(mix.values())
+        documents: list[Document] = []
+        expected_num_chunks = 0
+        factories = {
+            DataCategory.POSTS: (self.post, (1, 3)),
+            DataCategory.ARTICLES: (self.article, (2, 12)),
+            DataCategory.REPOSITORIES: (self.repository, (10, 200)),
+        }
+        for category, share in mix.items():
+            factory, (low, high) = factories[category]
+            target = round(num_chunks * share / total_share)
+            produced = 0
+            while produced < target:
+                document_chunks = min(self._rng.randint(low, high), target - produced)
+                documents.append(factory(document_chunks))
+                produced += document_chunks
+            expected_num_chunks += produced
+
+        self._rng.shuffle(documents)
+
+        return Corpus(documents=documents, expected_num_chunks=expected_num_chunks)